@@ -0,0 +1,43 @@
+"""MIT App Inventor .aia generator.
+
+Importing the package never loads tkinter; the GUI lives in
+aia_generator.gui and is started with ``python -m aia_generator gui``.
+"""
+
+from .batch import BatchJobResult, load_manifest, run_batch
+from .cache import BuildCache, file_digest
+from .compression import DEFAULT_POLICY, POLICIES, CompressionPolicy, get_policy
+from .config import CONFIG_FILE, ConfigStore, get_store, load_config, save_config
+from .core import (
+    BuildResult,
+    build_aia,
+    build_aia_with_temp_dir,
+    create_aia_file,
+    iter_project_entries,
+    parse_requirements,
+    render_project_entries,
+    source_date_epoch,
+    stream_aia,
+    validate_inputs,
+)
+from .errors import (
+    AIAGeneratorError,
+    BuildCancelled,
+    BuildError,
+    ConfigError,
+    ExtensionError,
+    ExtensionNotFoundError,
+    InputValidationError,
+    SavePathError,
+)
+from .extinfo import ExtensionInfo, ExtensionIngestor, extension_packages, read_extension_info
+from .extstore import ExtensionStore, StoredExtension
+from .features import FEATURE_RULES, FeatureRule, match_features, register_feature
+from .instrument import BuildStats, PhaseMetrics, write_json_lines
+from .model import Block, Component, Element, Form, Input, Project, Property
+from .plugins import PLUGINS, FeaturePlan, FeaturePlugin, PluginRegistry, register_plugin
+from .screens import ScreenSpec
+from .service import GeneratorService, serve
+from .templates import BLOCKS, COMPONENTS, Template, TemplateRegistry
+from .update import update_aia
+from .validate import ValidationReport, iter_validate, validate_aia
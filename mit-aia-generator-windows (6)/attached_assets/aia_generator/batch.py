@@ -0,0 +1,160 @@
+"""Batch generation from a JSONL or CSV manifest of build specs.
+
+Each spec carries the create_aia_file arguments for one project.  Jobs fan out
+over a process (or thread) pool and results are yielded as soon as each job
+finishes, in completion order.
+"""
+
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from .cache import DEFAULT_MAX_BYTES, BuildCache
+from .compression import DEFAULT_POLICY
+from .config import get_store
+from .core import create_aia_file
+from .extstore import ExtensionStore
+from .errors import InputValidationError
+
+# One BuildCache / ExtensionStore per directory in each worker process
+_worker_caches = {}
+
+SPEC_FIELDS = ("project_name", "user_id", "api_key", "cse_id", "search_prompt", "requirements", "extensions", "output",
+               "screens", "profile")
+
+@dataclass
+class BatchJobResult:
+    """Outcome of one batch job; error is None on success."""
+    index: int
+    project_name: str
+    path: str
+    size: int
+    duration: float
+    error: str = None
+    cached: bool = False
+    phases: dict = None
+    screens: dict = None
+    digest: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+def load_manifest(path):
+    """Read build specs from a .jsonl or .csv manifest.
+
+    In CSV manifests the extensions column holds ';'-separated paths.
+    Multi-screen specs (a "screens" list of ScreenSpec dicts) need JSONL.
+    """
+    specs = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                if None in row:
+                    raise InputValidationError(f"{path}:{reader.line_num}: {len(row[None])} more cell(s) than the header "
+                                               "has columns")
+                row = {key: value for key, value in row.items() if value not in (None, "")}
+                if "extensions" in row:
+                    row["extensions"] = [ext for ext in row["extensions"].split(";") if ext]
+                specs.append(row)
+        else:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    specs.append(json.loads(line))
+                except ValueError as e:
+                    raise InputValidationError(f"{path}:{line_no}: invalid JSON: {str(e)}") from e
+    return specs
+
+def prepare_jobs(specs, output_dir, defaults=None, config_store=None):
+    """Fill in defaults and give every spec a distinct output path.
+
+    A spec's "profile" names a saved config profile whose credentials fill
+    in any user_id/api_key/cse_id the spec leaves out; profiles are looked
+    up in config_store (default: the user's config file).  Specs without an
+    explicit output are written to
+    output_dir/{project_name}.aia; repeated project names get an _{index}
+    suffix so jobs never overwrite each other.
+    """
+    defaults = defaults or {}
+    jobs = []
+    used_outputs = set()
+    for index, spec in enumerate(specs):
+        unknown = set(spec) - set(SPEC_FIELDS)
+        if unknown:
+            raise InputValidationError(f"Spec {index}: unknown field(s) {', '.join(sorted(unknown))}")
+        job = {"requirements": "", "extensions": []}
+        job.update({key: value for key, value in defaults.items() if key in SPEC_FIELDS})
+        if spec.get("profile"):
+            job.update((config_store or get_store()).profile(spec["profile"]))
+        job.update(spec)
+        project_name = job.get("project_name", "")
+        output = job.get("output") or os.path.join(output_dir, f"{project_name}.aia")
+        if os.path.normcase(os.path.abspath(output)) in used_outputs:
+            output = os.path.join(output_dir, f"{project_name}_{index}.aia")
+        used_outputs.add(os.path.normcase(os.path.abspath(output)))
+        job["output"] = output
+        jobs.append(job)
+    return jobs
+
+def _worker_cache(cache_dir, cache_max_bytes):
+    if cache_dir is None:
+        return None
+    cache = _worker_caches.get(("cache", cache_dir))
+    if cache is None:
+        cache = _worker_caches[("cache", cache_dir)] = BuildCache(cache_dir, cache_max_bytes)
+    return cache
+
+def _worker_extension_store(store_dir):
+    if store_dir is None:
+        return None
+    store = _worker_caches.get(("extensions", store_dir))
+    if store is None:
+        store = _worker_caches[("extensions", store_dir)] = ExtensionStore(store_dir)
+    return store
+
+def _run_job(index, job, options):
+    start = time.perf_counter()
+    project_name = job.get("project_name", "")
+    try:
+        result = create_aia_file(project_name, job.get("user_id", ""), job.get("api_key", ""), job.get("cse_id", ""),
+                                 job.get("search_prompt", ""), job["requirements"], job["extensions"], job["output"],
+                                 timestamp=options["timestamp"],
+                                 cache=_worker_cache(options["cache_dir"], options["cache_max_bytes"]),
+                                 extension_store=_worker_extension_store(options["extension_store_dir"]),
+                                 compression=options["compression"], screens=job.get("screens"))
+    except Exception as e:
+        return BatchJobResult(index, project_name, job["output"], 0, time.perf_counter() - start, f"{type(e).__name__}: {str(e)}")
+    return BatchJobResult(index, project_name, result.path, result.size, time.perf_counter() - start,
+                          cached=result.cached, phases=result.stats.phases, screens=result.stats.screens,
+                          digest=result.digest)
+
+def run_batch(specs, output_dir, workers=None, use_threads=False, defaults=None,
+              timestamp=None, cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES, extension_store_dir=None,
+              compression=DEFAULT_POLICY, config_store=None):
+    """Build every spec and yield a BatchJobResult as each job completes.
+
+    workers defaults to the executor's own default (CPU count based).
+    A failing job is reported through its result and does not stop the batch.
+    With cache_dir or extension_store_dir set, all workers share one on-disk
+    BuildCache or ExtensionStore.
+    """
+    jobs = prepare_jobs(specs, output_dir, defaults, config_store)
+    options = {
+        "timestamp": timestamp,
+        "cache_dir": cache_dir,
+        "cache_max_bytes": cache_max_bytes,
+        "extension_store_dir": extension_store_dir,
+        "compression": compression,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    executor_cls = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+    with executor_cls(max_workers=workers) as pool:
+        futures = [pool.submit(_run_job, index, job, options) for index, job in enumerate(jobs)]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,219 @@
+"""Standalone benchmarks for the generator core.
+
+    python -m aia_generator.benchmarks all --json results.json
+    python -m aia_generator.benchmarks create|parse|batch|compression [--repeat N] [--json out.json]
+    python -m aia_generator.benchmarks compare baseline.json results.json [--threshold 0.1]
+
+Every suite yields rows of {suite, case, params, median_ms, ops_per_sec,
+peak_rss_kb, ...}.  peak_rss_kb is the process high-water mark after the
+case ran (children included for process-pool batches), so read it as "no
+worse than"; it is None where the resource module is unavailable (Windows).
+compare flags cases whose ops/sec dropped or peak RSS grew by more than the
+threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timezone
+
+from . import features
+from .batch import run_batch
+from .compression import POLICIES
+from .core import build_aia, create_aia_file, parse_requirements
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SMALL_EXTENSION_BYTES = 64 * 1024
+LARGE_EXTENSION_BYTES = 8 * 1024 * 1024
+REQUIREMENT_SENTENCE = ("The app should let the user search the web, show results in a scrollable area, "
+                        "remember the last query and handle network errors gracefully. ")
+
+def make_fake_extension(path, size):
+    """Write a .aix-like zip of about size bytes: half incompressible, half repetitive."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("com.example/components.json", b'[{"type": "com.example.Fake", "version": "1"}]')
+        zf.writestr("com.example/classes.jar", os.urandom(size // 2))
+        zf.writestr("com.example/files/component_build_infos.json",
+                    b'{"type": "com.example.Fake", "version": "1"}\n' * (size // 90))
+    return path
+
+def peak_rss_kb(include_children=False):
+    if resource is None:
+        return None
+    scale = 1024 if sys.platform == "darwin" else 1  # macOS reports bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale
+    if include_children:
+        peak = max(peak, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale)
+    return peak
+
+def _measure(fn, repeat):
+    timings = []
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), value
+
+def _row(suite, case, params, seconds, ops=1, include_children=False, **extra):
+    row = {
+        "suite": suite,
+        "case": case,
+        "params": params,
+        "median_ms": seconds * 1000,
+        "ops_per_sec": ops / seconds if seconds else None,
+        "peak_rss_kb": peak_rss_kb(include_children),
+    }
+    row.update(extra)
+    return row
+
+def bench_create(repeat=5, tmp=None):
+    """create_aia_file across list view/sound flags, 0/1/10 extensions and small/large .aix files."""
+    rows = []
+    with tempfile.TemporaryDirectory(dir=tmp) as work:
+        extension_sets = {("none", 0): []}
+        for size_name, size in (("small", SMALL_EXTENSION_BYTES), ("large", LARGE_EXTENSION_BYTES)):
+            paths = [make_fake_extension(os.path.join(work, f"{size_name.title()}{i}.aix"), size) for i in range(10)]
+            extension_sets[(size_name, 1)] = paths[:1]
+            extension_sets[(size_name, 10)] = paths
+        output = os.path.join(work, "Bench.aia")
+        for list_view in (False, True):
+            for sound in (False, True):
+                requirements = " ".join(text for flag, text in ((list_view, "list view"), (sound, "play a sound")) if flag)
+                for (size_name, count), extensions in extension_sets.items():
+                    seconds, result = _measure(lambda: create_aia_file(
+                        "Bench", "bench", "key", "cse", "query", requirements, extensions, output), repeat)
+                    params = {"list_view": list_view, "sound": sound, "extensions": count, "extension_size": size_name}
+                    case = f"list_view={int(list_view)} sound={int(sound)} ext={count}x{size_name}"
+                    rows.append(_row("create", case, params, seconds, size_bytes=result.size))
+    return rows
+
+def bench_parse(repeat=5):
+    """parse_requirements on requirement texts from 1 KB to 1 MB (cold: the match cache is cleared each run)."""
+    rows = []
+    for size in (1024, 100 * 1024, 1024 * 1024):
+        text = (REQUIREMENT_SENTENCE * (size // len(REQUIREMENT_SENTENCE) + 1))[:size] + " play a sound, list view"
+        def parse():
+            features._match_feature_names.cache_clear()
+            return parse_requirements(text)
+        seconds, _ = _measure(parse, repeat)
+        rows.append(_row("parse", f"{size // 1024}KB", {"bytes": size}, seconds, mb_per_sec=size / seconds / 1e6))
+    return rows
+
+def bench_batch(repeat=3, jobs=64, worker_counts=(1, 2, 4, 8), tmp=None):
+    """run_batch throughput (builds/sec) at several process-pool sizes."""
+    rows = []
+    specs = [{"project_name": f"Bench{i}", "user_id": "bench", "api_key": "key", "cse_id": "cse",
+              "search_prompt": f"query {i}", "requirements": "list view" if i % 2 else "play a sound"}
+             for i in range(jobs)]
+    with tempfile.TemporaryDirectory(dir=tmp) as work:
+        for workers in worker_counts:
+            def run():
+                failures = [r.error for r in run_batch(specs, os.path.join(work, f"w{workers}"), workers) if not r.ok]
+                if failures:
+                    raise RuntimeError(failures[0])
+            seconds, _ = _measure(run, repeat)
+            rows.append(_row("batch", f"workers={workers}", {"workers": workers, "jobs": jobs}, seconds, ops=jobs,
+                             include_children=True))
+    return rows
+
+def bench_compression(repeat=5, extension_mb=4, extension_count=2, tmp=None):
+    """Build time against archive size for every named CompressionPolicy."""
+    rows = []
+    with tempfile.TemporaryDirectory(dir=tmp) as work:
+        extensions = [make_fake_extension(os.path.join(work, f"Ext{i}.aix"), int(extension_mb * 1024 * 1024))
+                      for i in range(extension_count)]
+        for name, policy in POLICIES.items():
+            seconds, data = _measure(lambda: build_aia(
+                "Bench", "bench", "key", "cse", "query", "list view play a sound", extensions, compression=policy), repeat)
+            params = {"policy": name, "extension_mb": extension_mb, "extensions": extension_count}
+            rows.append(_row("compression", name, params, seconds, size_bytes=len(data)))
+    return rows
+
+SUITES = {
+    "create": bench_create,
+    "parse": bench_parse,
+    "batch": bench_batch,
+    "compression": bench_compression,
+}
+
+def run_suites(names, repeat):
+    rows = []
+    for name in names:
+        rows.extend(SUITES[name](repeat=repeat))
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "results": rows,
+    }
+
+def compare(baseline, current, threshold=0.1):
+    """Return (suite, case, message) for every case that regressed beyond threshold."""
+    previous = {(row["suite"], row["case"]): row for row in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        old = previous.get((row["suite"], row["case"]))
+        if old is None:
+            continue
+        if old["ops_per_sec"] and row["ops_per_sec"] and row["ops_per_sec"] < old["ops_per_sec"] * (1 - threshold):
+            regressions.append((row["suite"], row["case"],
+                                f"ops/sec {old['ops_per_sec']:.1f} -> {row['ops_per_sec']:.1f}"))
+        if old["peak_rss_kb"] and row["peak_rss_kb"] and row["peak_rss_kb"] > old["peak_rss_kb"] * (1 + threshold):
+            regressions.append((row["suite"], row["case"],
+                                f"peak RSS {old['peak_rss_kb']} KB -> {row['peak_rss_kb']} KB"))
+    return regressions
+
+def print_rows(rows):
+    for row in rows:
+        ops = f"{row['ops_per_sec']:10.1f}/s" if row["ops_per_sec"] else " " * 12
+        rss = f"{row['peak_rss_kb']:>9} KB" if row["peak_rss_kb"] is not None else ""
+        size = f" {row['size_bytes']:>12,} bytes" if "size_bytes" in row else ""
+        print(f"{row['suite']:<12} {row['case']:<36} {row['median_ms']:10.2f} ms {ops} {rss}{size}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m aia_generator.benchmarks")
+    subparsers = parser.add_subparsers(dest="suite", required=True)
+    for name in list(SUITES) + ["all"]:
+        suite = subparsers.add_parser(name, help="run every suite" if name == "all" else SUITES[name].__doc__)
+        suite.add_argument("--repeat", type=int, default=5)
+        suite.add_argument("--json", help="also write the results to this file")
+    comparison = subparsers.add_parser("compare", help="report regressions between two result files")
+    comparison.add_argument("baseline")
+    comparison.add_argument("current")
+    comparison.add_argument("--threshold", type=float, default=0.1, help="allowed relative change (default 0.1)")
+    args = parser.parse_args(argv)
+
+    if args.suite == "compare":
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, "r", encoding="utf-8") as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        for suite, case, message in regressions:
+            print(f"REGRESSION {suite} {case}: {message}")
+        return 1 if regressions else 0
+
+    report = run_suites(list(SUITES) if args.suite == "all" else [args.suite], args.repeat)
+    print_rows(report["results"])
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Content-addressed on-disk cache of generated .aia files.
+
+Entries are keyed by a SHA-256 of the normalized build inputs (including the
+digest of every bundled extension) and evicted least-recently-used once the
+store grows past max_bytes.  A cache hit costs one file copy.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from .errors import ExtensionNotFoundError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DIGEST_CACHE_SIZE = 256
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@lru_cache(maxsize=DIGEST_CACHE_SIZE)
+def stamped_digest(path, size, mtime_ns):
+    """file_digest of the file at absolute path, memoized process-wide on its size and mtime."""
+    return file_digest(path)
+
+class BuildCache:
+    """Size-bounded LRU store of .aia outputs under one directory.
+
+    Recency is tracked in memory and mirrored to file mtimes, so a new
+    process (or another worker sharing the directory) picks up a sensible
+    eviction order.  A key missing from the index is looked up on disk, so
+    entries put by other instances are found, and eviction re-reads the
+    directory so the bound holds across every writer.  Writes go through a
+    temporary file and os.replace.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.aia")
+
+    def _load_index(self, refresh=False):
+        if self._index is None or refresh:
+            found = []
+            for name in os.listdir(self.directory):
+                if name.endswith(".aia"):
+                    try:
+                        st = os.stat(os.path.join(self.directory, name))
+                    except FileNotFoundError:  # evicted by another writer meanwhile
+                        continue
+                    found.append((st.st_mtime_ns, name[:-4], st.st_size))
+            self._index = OrderedDict((key, size) for _, key, size in sorted(found))
+        return self._index
+
+    def extension_digest(self, path):
+        """Digest of an extension, memoized on (path, size, mtime)."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError as e:
+            raise ExtensionNotFoundError(f"Extension file not found: {path}") from e
+        return stamped_digest(os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+    def key_for(self, project_name, user_id, api_key, cse_id, search_prompt, features, extensions,
+                timestamp=None, compact=False, compression=None, screens=None):
+        """Hash the normalized build inputs into a cache key.
+
+        api_key and cse_id are part of the key because they are baked into
+        Screen1.bky.  Without a fixed timestamp the key ignores the build time
+        and a hit returns the archive stamped when it was first built.
+        """
+        inputs = {
+            "project_name": project_name,
+            "user_id": user_id,
+            "api_key": api_key,
+            "cse_id": cse_id,
+            "search_prompt": search_prompt,
+            "features": features,
+            "extensions": [[os.path.basename(path), self.extension_digest(path)] for path in extensions],
+            "timestamp": timestamp.isoformat() if timestamp else None,
+            "compact": compact,
+            "compression": compression.key() if compression else None,
+            "screens": screens,
+        }
+        encoded = json.dumps(inputs, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key, dest_path):
+        """Copy the cached archive for key to dest_path; False on a miss."""
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                try:
+                    index[key] = os.path.getsize(self._path(key))
+                except FileNotFoundError:
+                    self.misses += 1
+                    return False
+            index.move_to_end(key)
+            self.hits += 1
+        path = self._path(key)
+        try:
+            shutil.copyfile(path, dest_path)
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another process sharing the directory
+            with self._lock:
+                self._index.pop(key, None)
+                self.hits -= 1
+                self.misses += 1
+            return False
+        return True
+
+    def put(self, key, src_path):
+        """Store src_path under key and evict old entries beyond max_bytes."""
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as dst, open(src_path, "rb") as src:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            index = self._load_index(refresh=True)
+            index[key] = os.path.getsize(self._path(key))
+            index.move_to_end(key)
+            self._evict(index)
+
+    def _evict(self, index):
+        total = sum(index.values())
+        while total > self.max_bytes and len(index) > 1:
+            key, size = index.popitem(last=False)
+            total -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            logger.debug("Evicted cached build %s", key)
+
+    def size(self):
+        with self._lock:
+            return sum(self._load_index(refresh=True).values())
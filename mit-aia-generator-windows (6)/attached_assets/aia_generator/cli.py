@@ -0,0 +1,211 @@
+"""Command line entry point: ``python -m aia_generator``."""
+
+import argparse
+import json
+import logging
+import sys
+from dataclasses import asdict
+from datetime import datetime, timezone
+
+from .batch import load_manifest, run_batch
+from .cache import BuildCache
+from .compression import POLICIES, get_policy
+from .config import CREDENTIAL_KEYS, DEFAULT_PROFILE, load_config, save_config
+from .core import create_aia_file, stream_aia
+from .errors import AIAGeneratorError, ConfigError, InputValidationError
+from .extstore import ExtensionStore
+from .instrument import BuildStats, PhaseMetrics
+from .service import DEFAULT_PORT, serve
+from .update import update_aia
+from .validate import iter_validate
+
+def add_output_arguments(parser):
+    parser.add_argument("--cache-dir", help="reuse outputs from this content-addressed build cache")
+    parser.add_argument("--cache-max-mb", type=int, default=512, help="evict least recently used cache entries beyond this size")
+    parser.add_argument("--extension-store", help="keep extensions pre-compressed in this directory and raw-copy them")
+    parser.add_argument("--compression", default="default", choices=sorted(POLICIES), help="per-entry compression policy")
+    parser.add_argument("--compresslevel", type=int, help="deflate level 0-9 (overrides the policy's)")
+    parser.add_argument("--timestamp", type=int,
+                        help="fixed build time as Unix seconds, for byte-identical output (default: $SOURCE_DATE_EPOCH)")
+    parser.add_argument("--stats-file", help="append per-build phase timings to this file as JSON lines")
+    parser.add_argument("--metrics-file", help="write phase timing histograms to this file in Prometheus text format")
+
+def parse_timestamp(value):
+    return None if value is None else datetime.fromtimestamp(value, timezone.utc)
+
+def load_screens(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            screens = json.load(f)
+    except (OSError, ValueError) as e:
+        raise InputValidationError(f"Cannot read screen specs from {path}: {str(e)}") from e
+    if not isinstance(screens, list):
+        raise InputValidationError(f"{path} must contain a JSON list of screen specs")
+    return screens
+
+def export_stats(args, stats_list):
+    if args.stats_file:
+        with open(args.stats_file, "a", encoding="utf-8") as f:
+            for stats in stats_list:
+                f.write(stats.to_json_line() + "\n")
+    if args.metrics_file:
+        metrics = PhaseMetrics()
+        for stats in stats_list:
+            metrics.observe(stats)
+        with open(args.metrics_file, "w", encoding="utf-8") as f:
+            f.write(metrics.prometheus_text())
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m aia_generator", description="Generate MIT App Inventor .aia projects.")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="log verbosity (logs go to stderr)")
+    subparsers = parser.add_subparsers(dest="command")
+
+    build = subparsers.add_parser("build", help="generate a single .aia file")
+    build.add_argument("--project-name", required=True)
+    build.add_argument("--user-id", help="defaults to the saved configuration")
+    build.add_argument("--api-key", help="defaults to the saved configuration")
+    build.add_argument("--cse-id", help="defaults to the saved configuration")
+    build.add_argument("--profile", help="saved config profile for the defaults above")
+    build.add_argument("--prompt", required=True, help="initial search prompt")
+    build.add_argument("--requirements", default="", help="free-text functional requirements")
+    build.add_argument("--screens", help="JSON file with a list of screen specs (name, requirements, search_prompt, "
+                       "title); the first is the main screen")
+    build.add_argument("--extension", action="append", default=[], help=".aix file to bundle (repeatable)")
+    build.add_argument("--update-from", metavar="AIA", help="update this existing .aia (may be the output itself), "
+                       "copying unchanged entries; without --extension its bundled extensions are kept")
+    build.add_argument("--use-temp-dir", action="store_true", help="build through a temp directory tree (debugging)")
+    build.add_argument("--compact", action="store_true", help="write the .scm and .bky files without indentation")
+    build.add_argument("--save-config", action="store_true",
+                       help="remember user id, API key and CSE id (in --profile when given)")
+    build.add_argument("-o", "--output", required=True, help="path of the .aia file to write, or - for stdout")
+    add_output_arguments(build)
+
+    batch = subparsers.add_parser("batch", help="generate every project listed in a JSONL or CSV manifest")
+    batch.add_argument("manifest", help=".jsonl or .csv file of build specs")
+    batch.add_argument("--output-dir", default=".", help="directory for specs without an explicit output")
+    batch.add_argument("--workers", type=int, default=None, help="number of parallel workers")
+    batch.add_argument("--threads", action="store_true", help="use a thread pool instead of a process pool")
+    batch.add_argument("--profile", help="saved config profile for specs without credentials or a profile of their own")
+    add_output_arguments(batch)
+
+    validate = subparsers.add_parser("validate", help="check .aia archives and print one JSON report per archive")
+    validate.add_argument("paths", nargs="+", help=".aia files or directories to search recursively")
+    validate.add_argument("--workers", type=int, default=None, help="number of parallel workers")
+    validate.add_argument("--threads", action="store_true", help="use a thread pool instead of a process pool")
+    validate.add_argument("--check-crc", action="store_true", help="also inflate every member to verify its CRC")
+
+    serve = subparsers.add_parser("serve", help="run the local HTTP build service")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--data-dir", default="aia-service", help="where uploaded extensions are kept")
+    serve.add_argument("--workers", type=int, default=None, help="number of parallel builds")
+    serve.add_argument("--processes", action="store_true", help="use a process pool instead of a thread pool")
+    serve.add_argument("--queue-size", type=int, default=16, help="queued builds beyond which requests get 429")
+    serve.add_argument("--timeout", type=float, default=30.0, help="default per-request timeout in seconds")
+    serve.add_argument("--extension-store", help="keep extensions pre-compressed in this directory and raw-copy them")
+    serve.add_argument("--compression", default="default", choices=sorted(POLICIES), help="per-entry compression policy")
+    serve.add_argument("--compresslevel", type=int, help="deflate level 0-9 (overrides the policy's)")
+
+    subparsers.add_parser("gui", help="open the Tkinter window")
+    return parser
+
+def run_build(args):
+    config = {}
+    if not (args.user_id and args.api_key and args.cse_id):
+        try:
+            config = load_config(profile=args.profile or DEFAULT_PROFILE)
+        except ConfigError:
+            if not args.save_config:  # otherwise the profile is created below
+                raise
+    user_id = args.user_id or config.get("user_id", "")
+    api_key = args.api_key or config.get("api_key", "")
+    cse_id = args.cse_id or config.get("cse_id", "")
+    extension_store = ExtensionStore(args.extension_store) if args.extension_store else None
+    compression = get_policy(args.compression, args.compresslevel)
+    screens = load_screens(args.screens) if args.screens else None
+    if args.output == "-":
+        if args.cache_dir or args.use_temp_dir or args.update_from:
+            raise InputValidationError("--cache-dir, --use-temp-dir and --update-from need a file output, not -")
+        stats = BuildStats(args.project_name)
+        size = stream_aia(args.project_name, user_id, api_key, cse_id, args.prompt, args.requirements, args.extension,
+                          sys.stdout.buffer, parse_timestamp(args.timestamp), args.compact, extension_store, compression,
+                          stats, screens)
+        sys.stdout.buffer.flush()
+        logging.getLogger(__name__).info("Streamed %d bytes to stdout", size)
+        print(f"- ({size} bytes, sha256 {stats.digest})", file=sys.stderr)
+    elif args.update_from:
+        if args.cache_dir or args.use_temp_dir:
+            raise InputValidationError("--update-from cannot be combined with --cache-dir or --use-temp-dir")
+        result = update_aia(args.update_from, args.project_name, user_id, api_key, cse_id, args.prompt, args.requirements,
+                            args.extension or None, args.output, parse_timestamp(args.timestamp), args.compact, extension_store,
+                            compression, screens)
+        stats = result.stats
+    else:
+        cache = BuildCache(args.cache_dir, args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+        result = create_aia_file(args.project_name, user_id, api_key, cse_id, args.prompt, args.requirements,
+                                 args.extension, args.output, use_temp_dir=args.use_temp_dir,
+                                 timestamp=parse_timestamp(args.timestamp), compact=args.compact, cache=cache,
+                                 extension_store=extension_store, compression=compression, screens=screens)
+        stats = result.stats
+    if args.save_config:
+        save_config(user_id, api_key, cse_id, profile=args.profile)
+    export_stats(args, [stats])
+    if args.output != "-":
+        print(f"{result.path} ({result.size} bytes{', cached' if result.cached else ''}, sha256 {result.digest})")
+    return 0
+
+def run_batch_command(args):
+    specs = load_manifest(args.manifest)
+    defaults = {}
+    # The saved config is only needed for specs that leave a credential out
+    if any(not all(spec.get(key) for key in CREDENTIAL_KEYS) for spec in specs):
+        defaults = load_config(profile=args.profile or DEFAULT_PROFILE)
+    failures = 0
+    stats_list = []
+    results = run_batch(specs, args.output_dir, args.workers, args.threads, defaults,
+                        timestamp=parse_timestamp(args.timestamp), cache_dir=args.cache_dir,
+                        cache_max_bytes=args.cache_max_mb * 1024 * 1024, extension_store_dir=args.extension_store,
+                        compression=get_policy(args.compression, args.compresslevel))
+    for result in results:
+        failures += not result.ok
+        if result.ok:
+            stats_list.append(BuildStats.from_phases(result.project_name, result.phases, screens=result.screens))
+        print(json.dumps(asdict(result)), flush=True)
+    export_stats(args, stats_list)
+    return 1 if failures else 0
+
+def run_validate_command(args):
+    checked = failures = 0
+    for report in iter_validate(args.paths, args.workers, args.threads, args.check_crc):
+        checked += 1
+        failures += not report.ok
+        print(json.dumps(dict(asdict(report), ok=report.ok)), flush=True)
+    logging.getLogger(__name__).info("Validated %d archives, %d invalid", checked, failures)
+    return 1 if failures else 0
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level, format="%(levelname)s %(name)s: %(message)s", stream=sys.stderr)
+    if args.command == "gui":
+        from . import gui
+        gui.main()
+        return 0
+    if args.command is None:
+        parser.print_help()
+        return 2
+    try:
+        if args.command == "batch":
+            return run_batch_command(args)
+        if args.command == "validate":
+            return run_validate_command(args)
+        if args.command == "serve":
+            serve(args.data_dir, host=args.host, port=args.port, workers=args.workers, use_processes=args.processes,
+                  queue_size=args.queue_size, timeout=args.timeout, extension_store_dir=args.extension_store,
+                  compression=get_policy(args.compression, args.compresslevel))
+            return 0
+        return run_build(args)
+    except AIAGeneratorError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
@@ -0,0 +1,92 @@
+"""Per-entry compression policies for .aia archives.
+
+Extensions (.aix) and media assets are already compressed, so deflating them
+again costs build time for almost no size gain.  A CompressionPolicy decides
+STORED vs DEFLATED per entry from its file suffix, plus the deflate level.
+
+The zip format does not record the deflate level, so every archive's
+comment names it (archive_comment); update_aia only reuses deflated bytes
+from an archive whose comment shows the level it is asked for.
+"""
+
+import re
+import zipfile
+import zlib
+from dataclasses import asdict, dataclass
+
+from .errors import InputValidationError
+
+# Payloads that are already compressed containers or media
+PRECOMPRESSED_SUFFIXES = (".aix", ".apk", ".zip", ".mp3", ".ogg", ".m4a", ".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+@dataclass(frozen=True)
+class CompressionPolicy:
+    """How each archive entry is compressed.
+
+    Entries whose name ends with one of stored_suffixes are STORED; all
+    others use default, deflated at compresslevel (None means zlib's default).
+    """
+    default: int = zipfile.ZIP_DEFLATED
+    compresslevel: int = None
+    stored_suffixes: tuple = PRECOMPRESSED_SUFFIXES
+
+    def compress_type_for(self, arcname):
+        if arcname.lower().endswith(self.stored_suffixes):
+            return zipfile.ZIP_STORED
+        return self.default
+
+    def apply(self, zinfo):
+        """Set zinfo's compression type and level for its name."""
+        zinfo.compress_type = self.compress_type_for(zinfo.filename)
+        zinfo._compresslevel = self.compresslevel if zinfo.compress_type == zipfile.ZIP_DEFLATED else None
+        return zinfo
+
+    @property
+    def deflate_level(self):
+        """The deflate level actually used for DEFLATED entries."""
+        return effective_level(self.compresslevel)
+
+    def archive_comment(self):
+        return f"aia_generator deflate-level={self.deflate_level}".encode("ascii")
+
+    def key(self):
+        """JSON-friendly description, used in cache keys and benchmark reports."""
+        return asdict(self)
+
+POLICIES = {
+    # Deflate generated text, store already-compressed payloads
+    "default": CompressionPolicy(),
+    "fast": CompressionPolicy(compresslevel=1),
+    "smallest": CompressionPolicy(compresslevel=9, stored_suffixes=()),
+    # Everything deflated at the default level, as builds did before policies existed
+    "deflate-all": CompressionPolicy(stored_suffixes=()),
+    "store-all": CompressionPolicy(default=zipfile.ZIP_STORED),
+}
+DEFAULT_POLICY = POLICIES["default"]
+
+_COMMENT_PATTERN = re.compile(rb"^aia_generator deflate-level=(\d)$")
+# The level zlib uses for Z_DEFAULT_COMPRESSION
+_ZLIB_DEFAULT_LEVEL = 6
+
+def effective_level(compresslevel):
+    """The deflate level zlib uses for compresslevel (None or Z_DEFAULT_COMPRESSION mean zlib's default)."""
+    if compresslevel is None or compresslevel == zlib.Z_DEFAULT_COMPRESSION:
+        return _ZLIB_DEFAULT_LEVEL
+    return compresslevel
+
+def deflate_level_of(comment):
+    """The deflate level an archive_comment names, or None for any other comment."""
+    match = _COMMENT_PATTERN.match(comment or b"")
+    return int(match.group(1)) if match else None
+
+def get_policy(name, compresslevel=None):
+    """Look up a named policy, optionally overriding its deflate level."""
+    try:
+        policy = POLICIES[name]
+    except KeyError:
+        raise InputValidationError(f"Unknown compression policy {name!r}; choose from {', '.join(POLICIES)}") from None
+    if compresslevel is not None:
+        if not 0 <= compresslevel <= 9:
+            raise InputValidationError("compresslevel must be between 0 and 9")
+        policy = CompressionPolicy(policy.default, compresslevel, policy.stored_suffixes)
+    return policy
@@ -0,0 +1,207 @@
+"""Saved user_id/api_key/cse_id configuration, with named profiles.
+
+The top-level user_id/api_key/cse_id are the default profile, so files
+written by older versions still load; other profiles live under
+"profiles".  A ConfigStore keeps the parsed file in memory and re-reads it
+only when its mtime or size changes (checked at most every check_interval
+seconds).  Writes take an exclusive lock on a .lock file next to the
+config, merge into the current on-disk contents and replace the file
+atomically; saving values that are already stored costs one stat and
+neither locks nor rewrites the file.  A save that does change something
+is checked again under the lock against the file as it is then.
+"""
+
+import copy
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from .errors import ConfigError
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Configuration file path in user's home directory
+CONFIG_FILE = os.path.expanduser("~/aia_generator_config.json")
+CREDENTIAL_KEYS = ("user_id", "api_key", "cse_id")
+DEFAULT_PROFILE = "default"
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+@contextmanager
+def _file_lock(path):
+    """Hold an exclusive lock on path (created if needed) across processes."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ~10 s; keep waiting
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _stat_stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+class ConfigStore:
+    """In-memory view of one config file, refreshed when the file changes."""
+
+    def __init__(self, path=CONFIG_FILE, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._config = None
+        self._stamp = None
+        self._checked = 0.0
+
+    def _read(self):
+        stamp = _stat_stamp(self.path)
+        if stamp is None:
+            logger.debug("No config file found")
+            return {}, None
+        logger.debug("Loading config from %s", self.path)
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ConfigError(f"Failed to load config: {str(e)}") from e
+        if not isinstance(config, dict):
+            raise ConfigError(f"Failed to load config: {self.path} does not hold a JSON object")
+        return config, stamp
+
+    def _current(self, check_interval=None):
+        with self._lock:
+            now = time.monotonic()
+            interval = self.check_interval if check_interval is None else check_interval
+            if self._config is None or now - self._checked >= interval:
+                if self._config is None or _stat_stamp(self.path) != self._stamp:
+                    self._config, self._stamp = self._read()
+                self._checked = now
+            return self._config
+
+    def load(self):
+        """Return a copy of the whole configuration, or {} if there is none."""
+        return copy.deepcopy(self._current())
+
+    def profiles(self):
+        config = self._current()
+        names = [DEFAULT_PROFILE] if any(key in config for key in CREDENTIAL_KEYS) else []
+        return names + [name for name in config.get("profiles", {}) if name != DEFAULT_PROFILE]
+
+    def profile(self, name=None):
+        """Credentials {user_id, api_key, cse_id} of a profile (the default one when name is None)."""
+        config = self._current()
+        if name in (None, DEFAULT_PROFILE):
+            source = config
+        else:
+            try:
+                source = config.get("profiles", {})[name]
+            except KeyError:
+                raise ConfigError(f"Unknown config profile {name!r}") from None
+        return {key: source[key] for key in CREDENTIAL_KEYS if key in source}
+
+    def _update(self, change):
+        """Apply change(config) to the on-disk config under the file lock and replace it atomically.
+
+        change returns whether it modified config; if not, the file is not
+        rewritten and _update returns False.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            with self._lock, _file_lock(self.path + ".lock"):
+                config, stamp = self._read()
+                if not change(config):
+                    self._config, self._stamp, self._checked = config, stamp, time.monotonic()
+                    return False
+                logger.debug("Saving config to %s", self.path)
+                fd, tmp_path = tempfile.mkstemp(prefix=".aia_generator_config.", suffix=".tmp", dir=directory)
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump(config, f, indent=2)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+                self._config, self._stamp, self._checked = config, _stat_stamp(self.path), time.monotonic()
+        except OSError as e:
+            raise ConfigError(f"Failed to save config: {str(e)}") from e
+        return True
+
+    def save_profile(self, user_id, api_key, cse_id, name=None):
+        """Store credentials under a profile; returns False, without touching the file, if they are unchanged."""
+        values = {"user_id": user_id, "api_key": api_key, "cse_id": cse_id}
+        # One stat tells whether the cached config is current; only a real change takes the lock
+        try:
+            self._current(check_interval=0)
+            if self.profile(name) == values:
+                return False
+        except ConfigError:
+            pass
+
+        def change(config):
+            if name in (None, DEFAULT_PROFILE):
+                if all(config.get(key) == value for key, value in values.items()):
+                    return False
+                config.update(values)
+            else:
+                profiles = config.setdefault("profiles", {})
+                if profiles.get(name) == values:
+                    return False
+                profiles[name] = values
+            return True
+
+        return self._update(change)
+
+    def delete_profile(self, name):
+        def change(config):
+            if name in (None, DEFAULT_PROFILE):
+                return [config.pop(key) for key in CREDENTIAL_KEYS if key in config]
+            return config.get("profiles", {}).pop(name, None) is not None
+
+        return self._update(change)
+
+def get_store(path=CONFIG_FILE):
+    """The process-wide ConfigStore for path."""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ConfigStore(path)
+        return store
+
+def load_config(path=CONFIG_FILE, profile=None):
+    """Load saved configuration (the credentials of profile when given), or {} if there is none."""
+    store = get_store(path)
+    return store.load() if profile is None else store.profile(profile)
+
+def save_config(user_id, api_key, cse_id, path=CONFIG_FILE, profile=None):
+    """Save credentials to the config file (to a named profile when given); a no-op when unchanged."""
+    return get_store(path).save_profile(user_id, api_key, cse_id, profile)
@@ -0,0 +1,521 @@
+"""Headless .aia generator core.
+
+Nothing in this module touches tkinter, so it can be imported on build servers
+and called repeatedly in one process.  Failures are reported by raising the
+exceptions in aia_generator.errors.
+
+Builds are reproducible once the build time is fixed, either by passing a
+timestamp or by setting SOURCE_DATE_EPOCH: entries are written in a fixed
+order with normalized zip metadata, and component Uuids are derived from
+component names (plugins.component_uuid).  Every build hashes the archive
+as it writes it and reports the SHA-256 in stats.digest (and
+create_aia_file on its BuildResult), so identical outputs can be
+deduplicated.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import zipfile
+import shutil
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from .cache import file_digest
+from .compression import DEFAULT_POLICY
+from .errors import AIAGeneratorError, BuildError, ExtensionError, ExtensionNotFoundError, InputValidationError, SavePathError
+from .extinfo import extension_packages
+from .features import match_features
+from .instrument import BuildStats
+from .plugins import PLUGINS
+from .screens import iter_rendered_screens, normalize_screens, screen_plans, screens_key
+from .templates import PROJECT_PROPERTIES
+from .ziputil import COPY_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Earliest modification time a zip entry can record
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+# Made-by system recorded in every entry (3 = Unix), whatever the build platform
+ZIP_CREATE_SYSTEM = 3
+
+@dataclass
+class BuildResult:
+    """Outcome of a successful create_aia_file call; digest is the archive's SHA-256."""
+    path: str
+    size: int
+    cached: bool = False
+    stats: BuildStats = None
+    digest: str = None
+
+def source_date_epoch():
+    """The build time fixed by the SOURCE_DATE_EPOCH environment variable, or None."""
+    value = os.environ.get("SOURCE_DATE_EPOCH")
+    if not value:
+        return None
+    try:
+        return datetime.fromtimestamp(int(value), timezone.utc)
+    except (ValueError, OverflowError, OSError) as e:
+        raise InputValidationError(f"Invalid SOURCE_DATE_EPOCH {value!r}: {str(e)}") from e
+
+def validate_inputs(project_name, user_id, api_key, cse_id, search_prompt):
+    """Check the required project inputs, raising InputValidationError."""
+    if not project_name or not user_id or not api_key or not cse_id or not search_prompt:
+        raise InputValidationError("All fields except requirements are required!")
+    if not project_name.isalnum():
+        raise InputValidationError("Project name must contain only letters and numbers!")
+
+def parse_requirements(requirements):
+    """Parse requirements to determine app features."""
+    features = match_features(requirements)
+    logger.debug("Parsed requirements: %s", features)
+    return features
+
+def iter_project_entries(project_name, user_id, api_key, cse_id, search_prompt, features, extension_names,
+                         timestamp=None, compact=False, screens=None, screen_workers=None, stats=None,
+                         extension_packages=None):
+    """Render the generated project files one at a time as (path relative to the project root, bytes).
+
+    Components, blocks and assets come from the feature plugins that features
+    enable (see plugins.py).  With screens (ScreenSpecs or dicts) every
+    screen is built from its own requirements instead, the first being the
+    main screen, and the screens render in parallel on up to screen_workers
+    threads; their files are yielded in screen order and each screen's
+    render time is recorded in stats.screens.  Extensions are not included;
+    callers add them under assets/external_comps.  timestamp (a UTC
+    datetime) fixes the project.properties header line; it defaults to
+    SOURCE_DATE_EPOCH, then to the current time.  compact drops the
+    indentation from the .scm and .bky files.  extension_packages lists the
+    component types for external_comps (see _extension_packages); without
+    it they are guessed from extension_names.
+    """
+    if screens:
+        screens = normalize_screens(screens)
+        plans = screen_plans(screens, compact)
+    else:
+        screens = normalize_screens(None)
+        plans = [PLUGINS.resolve(features, compact)]
+    missing = [name for plan in plans for name in plan.extensions if name not in extension_names]
+    if missing:
+        raise ExtensionNotFoundError(f"The requested features need these extensions: {', '.join(dict.fromkeys(missing))}")
+    values = {"search_prompt": search_prompt, "api_key": api_key, "cse_id": cse_id,
+              "project_name": project_name, "user_id": user_id}
+    src_prefix = f"src/appinventor/ai_{user_id}/{project_name}"
+
+    # project.properties
+    if extension_packages is None:
+        extension_packages = [_guessed_package(name) for name in extension_names]
+    external_comps = ",".join(extension_packages)
+    yield "youngandroidproject/project.properties", PROJECT_PROPERTIES.render(
+        timestamp=(timestamp or source_date_epoch() or datetime.utcnow()).strftime("%a %b %d %H:%M:%S UTC %Y"),
+        project_name=project_name, user_id=user_id, main_screen=screens[0].name,
+        external_comps=external_comps).encode("utf-8")
+
+    # Assets shared by every screen that uses them
+    assets = {}
+    for plan in plans:
+        assets.update(plan.assets)
+    yield from assets.items()
+
+    for screen in iter_rendered_screens(screens, plans, project_name, values, compact, screen_workers):
+        if stats is not None:
+            stats.screens[screen.name] = screen.seconds
+        yield f"{src_prefix}/{screen.name}.scm", screen.scm
+        yield f"{src_prefix}/{screen.name}.bky", screen.bky
+
+def render_project_entries(project_name, user_id, api_key, cse_id, search_prompt, features, extension_names,
+                           timestamp=None, compact=False, screens=None, stats=None, extension_packages=None):
+    """Render the generated project files as {path relative to the project root: bytes}."""
+    return dict(iter_project_entries(project_name, user_id, api_key, cse_id, search_prompt, features, extension_names,
+                                     timestamp, compact, screens, stats=stats, extension_packages=extension_packages))
+
+def _validate_save_path(save_path):
+    save_dir = os.path.dirname(save_path) or os.getcwd()
+    save_path = os.path.normpath(save_path)
+    if not os.access(save_dir, os.W_OK):
+        raise SavePathError(f"No write permission in {save_dir}")
+    logger.debug("Save path validated: %s", save_path)
+    return save_path
+
+def _extension_names(extensions):
+    extension_names = []
+    for ext_path in extensions:
+        if not os.path.exists(ext_path):
+            raise ExtensionNotFoundError(f"Extension file not found: {ext_path}")
+        extension_names.append(os.path.splitext(os.path.basename(ext_path))[0])
+    return extension_names
+
+def _guessed_package(name):
+    return f"com.appybuilder.{name}"
+
+def _extension_packages(extensions):
+    """Component types of the extensions, read from their metadata (guessed for unreadable files)."""
+    packages = []
+    for ext_path in extensions:
+        try:
+            found = extension_packages(ext_path)
+        except ExtensionError as e:
+            logger.warning("%s; listing it as %s", e, _guessed_package(os.path.splitext(os.path.basename(ext_path))[0]))
+            found = [_guessed_package(os.path.splitext(os.path.basename(ext_path))[0])]
+        packages.extend(package for package in found if package not in packages)
+    return packages
+
+def _zip_entry(arcname, timestamp, compression):
+    """ZipInfo for arcname, compressed per the policy and stamped with timestamp.
+
+    The time defaults to SOURCE_DATE_EPOCH, then to now; permissions and the
+    made-by system are the same on every platform.
+    """
+    timestamp = timestamp or source_date_epoch() or datetime.now()
+    zinfo = zipfile.ZipInfo(arcname, max(timestamp.timetuple()[:6], ZIP_EPOCH))
+    zinfo.external_attr = 0o600 << 16
+    zinfo.create_system = ZIP_CREATE_SYSTEM
+    return compression.apply(zinfo)
+
+def _write_extension(zf, zinfo, ext_path, extension_store=None, stats=None):
+    """Add the extension (or other file) at ext_path to zf as zinfo, raw-copied from extension_store when given.
+
+    A streamed copy checks stats for cancellation between chunks.
+    """
+    if extension_store is not None:
+        stored = extension_store.add(ext_path, compress=extension_store.uses_blob(zinfo))
+        extension_store.write_to_zip(zf, zinfo, stored, ext_path)
+    else:
+        zinfo.file_size = os.path.getsize(ext_path)
+        with open(ext_path, "rb") as src, zf.open(zinfo, "w") as dst:
+            for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b""):
+                if stats is not None:
+                    stats.checkpoint()
+                dst.write(chunk)
+
+class _CountingWriter:
+    """Write-only wrapper that counts and hashes bytes for streams that cannot tell()."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data):
+        self.stream.write(data)
+        self.count += len(data)
+        self.sha256.update(data)
+        return len(data)
+
+    def tell(self):
+        return self.count
+
+    def flush(self):
+        if hasattr(self.stream, "flush"):
+            self.stream.flush()
+
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+class _HashingFile:
+    """Seekable wrapper that hashes what a ZipFile writes, without reading it back.
+
+    ZipFile only seeks back to patch the local header of the member it has
+    just written, then returns to the end.  Bytes written since the last
+    return to the end are kept in memory and hashed at the next one, when
+    they can no longer change; hexdigest() hashes the rest.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.sha256 = hashlib.sha256()
+        self._start = self._hashed = self._pos = stream.tell()
+        self._pending = bytearray()
+
+    def write(self, data):
+        offset = self._pos - self._hashed
+        if offset < 0:
+            raise io.UnsupportedOperation("cannot rewrite bytes that were already hashed")
+        self.stream.write(data)
+        self._pending[offset:offset + len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        self._pos = self.stream.seek(offset, whence)
+        if self._pos == self._hashed + len(self._pending):
+            self._commit()
+        return self._pos
+
+    def _commit(self):
+        self.sha256.update(self._pending)
+        self._hashed += len(self._pending)
+        self._pending = bytearray()
+
+    def tell(self):
+        return self._pos
+
+    def seekable(self):
+        return True
+
+    def flush(self):
+        self.stream.flush()
+
+    @property
+    def count(self):
+        return self._hashed + len(self._pending) - self._start
+
+    def hexdigest(self):
+        self._commit()
+        return self.sha256.hexdigest()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stream.close()
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+def _is_seekable(stream):
+    try:
+        return stream.seekable()
+    except (AttributeError, OSError, ValueError):
+        return False
+
+def _write_archive(target, project_name, user_id, api_key, cse_id, search_prompt, requirements, extensions,
+                   timestamp, compact, extension_store, compression, stats, screens=None):
+    """Render and zip the project into target (a writable binary stream), entry by entry.
+
+    The archive is hashed as it is written, into stats.digest; returns the
+    number of bytes written.
+    """
+    with stats.phase("parse_requirements"):
+        features = parse_requirements(requirements)
+    with stats.phase("validation"):
+        extension_names = _extension_names(extensions)
+        packages = _extension_packages(extensions)
+        screens = normalize_screens(screens) if screens else None
+
+    writer = _HashingFile(target) if _is_seekable(target) else _CountingWriter(target)
+    with stats.phase("zip"):
+        zf = zipfile.ZipFile(writer, "w", zipfile.ZIP_DEFLATED)
+        zf.comment = compression.archive_comment()
+    try:
+        # Each generated file is written as soon as it is rendered, so a
+        # streaming target sees the first bytes before extensions are read.
+        entries = iter_project_entries(project_name, user_id, api_key, cse_id, search_prompt, features, extension_names,
+                                       timestamp, compact, screens, stats=stats, extension_packages=packages)
+        while True:
+            stats.checkpoint()
+            with stats.phase("render"):
+                entry = next(entries, None)
+            if entry is None:
+                break
+            relpath, data = entry
+            with stats.phase("zip"):
+                zf.writestr(_zip_entry(f"{project_name}/{relpath}", timestamp, compression), data)
+            stats.count("entries")
+            logger.debug("Added to zip: %s/%s", project_name, relpath)
+        with stats.phase("zip"):
+            zf.fp.flush()
+        with stats.phase("extensions"):
+            for ext_path in extensions:
+                stats.checkpoint()
+                zinfo = _zip_entry(f"{project_name}/assets/external_comps/{os.path.basename(ext_path)}", timestamp, compression)
+                _write_extension(zf, zinfo, ext_path, extension_store, stats)
+                stats.count("entries")
+                stats.count("extension_bytes", zinfo.file_size)
+                logger.debug("Added extension to zip: %s -> %s", ext_path, zinfo.filename)
+    finally:
+        with stats.phase("zip"):
+            zf.close()
+    stats.digest = writer.hexdigest()
+    logger.info("Built %d entries for %s", stats.counters.get("entries", 0), project_name)
+    return writer.count
+
+def build_aia(project_name, user_id, api_key, cse_id, search_prompt, requirements, extensions, save_path=None,
+              timestamp=None, compact=False, extension_store=None, compression=DEFAULT_POLICY, stats=None,
+              screens=None):
+    """Assemble the .aia archive in memory, without a temporary directory.
+
+    Generated files are written straight into the zip with writestr and
+    extensions are streamed from their source paths.  Returns the archive
+    bytes when save_path is None, otherwise writes it to save_path and
+    returns the path.  Passing a timestamp (UTC datetime) makes the output
+    byte-identical for identical inputs; compact emits unindented
+    Screen1.scm and Screen1.bky.  With an ExtensionStore, extensions are
+    raw-copied from its pre-compressed blobs instead of being recompressed.
+    compression is the CompressionPolicy choosing STORED or DEFLATED per
+    entry.  screens (ScreenSpecs or dicts) builds a multi-screen project;
+    see iter_project_entries.  Phase and screen timings, and the archive's
+    SHA-256 (stats.digest), are added to stats (a BuildStats) when given.
+    """
+    stats = stats if stats is not None else BuildStats(project_name)
+    if save_path is None:
+        target = io.BytesIO()
+        _write_archive(target, project_name, user_id, api_key, cse_id, search_prompt, requirements, extensions,
+                       timestamp, compact, extension_store, compression, stats, screens)
+        return target.getvalue()
+    with open(save_path, "wb") as target:
+        _write_archive(target, project_name, user_id, api_key, cse_id, search_prompt, requirements, extensions,
+                       timestamp, compact, extension_store, compression, stats, screens)
+    return save_path
+
+def stream_aia(project_name, user_id, api_key, cse_id, search_prompt, requirements, extensions, fileobj,
+               timestamp=None, compact=False, extension_store=None, compression=DEFAULT_POLICY, stats=None,
+               screens=None):
+    """Validate the inputs and write the .aia incrementally to a writable binary stream.
+
+    fileobj may be non-seekable (an HTTP response, a pipe, stdout); entries
+    then carry data descriptors instead of being patched in place.  Nothing
+    touches the filesystem apart from reading extensions.  Returns the
+    number of bytes written, and sets stats.digest to their SHA-256;
+    options are as for build_aia.
+    """
+    stats = stats if stats is not None else BuildStats(project_name)
+    with stats.phase("validation"):
+        validate_inputs(project_name, user_id, api_key, cse_id, search_prompt)
+    try:
+        written = _write_archive(fileobj, project_name, user_id, api_key, cse_id, search_prompt, requirements,
+                                 extensions, timestamp, compact, extension_store, compression, stats, screens)
+    except AIAGeneratorError:
+        raise
+    except OSError as e:
+        raise BuildError(f"Failed to stream .aia file: {str(e)}") from e
+    stats.count("bytes_written", written)
+    return written
+
+def build_aia_with_temp_dir(project_name, user_id, api_key, cse_id, search_prompt, requirements, extensions, save_path,
+                            temp_root=None, timestamp=None, compact=False, compression=DEFAULT_POLICY, stats=None,
+                            screens=None):
+    """Build the .aia through a temp_{project_name}_* directory tree.
+
+    Slower than build_aia; kept for debugging (pass use_temp_dir=True to
+    create_aia_file).  The tree gets a unique name under temp_root, so
+    concurrent builds of the same project never collide, and it is removed
+    once the archive is written.  Entries are zipped in build_aia's order,
+    so both give the same archive and stats.digest for the same inputs.
+    """
+    stats = stats if stats is not None else BuildStats(project_name)
+    with stats.phase("parse_requirements"):
+        features = parse_requirements(requirements)
+    with stats.phase("validation"):
+        extension_names = _extension_names(extensions)
+        packages = _extension_packages(extensions)
+    with stats.phase("render"):
+        entries = render_project_entries(project_name, user_id, api_key, cse_id, search_prompt, features, extension_names,
+                                         timestamp, compact, screens, stats, packages)
+
+    with stats.phase("directory_setup"):
+        temp_dir = tempfile.mkdtemp(prefix=f"temp_{project_name}_", dir=temp_root)
+        external_comps_dir = os.path.join(temp_dir, "assets", "external_comps")
+        logger.debug("Creating directories under %s", temp_dir)
+        os.makedirs(external_comps_dir, exist_ok=True)
+    try:
+        required_files = []
+        with stats.phase("write_files"):
+            for relpath, data in entries.items():
+                stats.checkpoint()
+                file_path = os.path.join(temp_dir, *relpath.split("/"))
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                with open(file_path, "wb") as f:
+                    f.write(data)
+                logger.debug("Created %s", file_path)
+                required_files.append((file_path, relpath))
+        with stats.phase("extensions"):
+            for ext_path in extensions:
+                stats.checkpoint()
+                dest_path = os.path.join(external_comps_dir, os.path.basename(ext_path))
+                logger.debug("Copying extension: %s to %s", ext_path, dest_path)
+                shutil.copyfile(ext_path, dest_path)
+                required_files.append((dest_path, f"assets/external_comps/{os.path.basename(ext_path)}"))
+
+        # Verify all files exist
+        with stats.phase("verify"):
+            for file_path, _ in required_files:
+                if not os.path.exists(file_path):
+                    raise BuildError(f"Required file missing: {file_path}")
+
+        # Zipped in the order they were written and stamped like build_aia's
+        # entries, so the archive does not depend on directory order or mtimes
+        logger.debug("Zipping files to %s", save_path)
+        with stats.phase("zip"):
+            with _HashingFile(open(save_path, "wb")) as writer:
+                with zipfile.ZipFile(writer, "w", zipfile.ZIP_DEFLATED) as zf:
+                    zf.comment = compression.archive_comment()
+                    for file_path, relpath in required_files:
+                        stats.checkpoint()
+                        arcname = f"{project_name}/{relpath}"
+                        _write_extension(zf, _zip_entry(arcname, timestamp, compression), file_path, stats=stats)
+                        logger.debug("Added to zip: %s -> %s", file_path, arcname)
+                stats.digest = writer.hexdigest()
+    finally:
+        with stats.phase("cleanup"):
+            logger.debug("Cleaning up temporary directory: %s", temp_dir)
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return save_path
+
+def create_aia_file(project_name, user_id, api_key, cse_id, search_prompt, requirements, extensions, save_path,
+                    use_temp_dir=False, timestamp=None, compact=False, cache=None, extension_store=None,
+                    compression=DEFAULT_POLICY, screens=None, stats=None):
+    """Validate the inputs, build the .aia at save_path and return a BuildResult.
+
+    With a BuildCache, a hit is copied to save_path instead of rebuilding and
+    fresh builds are stored for next time.  The result's stats hold the
+    time spent in each phase and its digest the SHA-256 of the archive;
+    pass stats to follow or cancel the build from another thread.  A build
+    that fails or is cancelled leaves no partial file at save_path.
+    """
+    stats = stats if stats is not None else BuildStats(project_name)
+    with stats.phase("validation"):
+        validate_inputs(project_name, user_id, api_key, cse_id, search_prompt)
+    try:
+        with stats.phase("validation"):
+            save_path = _validate_save_path(save_path)
+            timestamp = timestamp or source_date_epoch()
+        cache_key = None
+        if cache is not None:
+            with stats.phase("cache_lookup"):
+                cache_key = cache.key_for(project_name, user_id, api_key, cse_id, search_prompt,
+                                          parse_requirements(requirements), extensions, timestamp, compact, compression,
+                                          screens_key(screens))
+                hit = cache.get(cache_key, save_path)
+            if hit:
+                logger.info("Cache hit for %s: %s", project_name, save_path)
+                stats.count("cache_hits")
+                with stats.phase("digest"):
+                    stats.digest = file_digest(save_path)
+                return BuildResult(save_path, os.path.getsize(save_path), cached=True, stats=stats, digest=stats.digest)
+        previous = _file_stamp(save_path)
+        try:
+            if use_temp_dir:
+                build_aia_with_temp_dir(project_name, user_id, api_key, cse_id, search_prompt, requirements, extensions,
+                                        save_path, timestamp=timestamp, compact=compact, compression=compression,
+                                        stats=stats, screens=screens)
+            else:
+                build_aia(project_name, user_id, api_key, cse_id, search_prompt, requirements, extensions, save_path,
+                          timestamp, compact, extension_store, compression, stats, screens)
+        except BaseException:
+            # Remove what this build wrote, but not a file it failed before touching
+            if _file_stamp(save_path) not in (None, previous):
+                logger.debug("Removing partial output %s", save_path)
+                os.remove(save_path)
+            raise
+
+        # Verify .aia file
+        with stats.phase("verify"):
+            if not os.path.exists(save_path) or os.path.getsize(save_path) == 0:
+                raise BuildError(f".aia file not created or empty: {save_path}")
+            size = os.path.getsize(save_path)
+        if cache_key is not None:
+            with stats.phase("cache_store"):
+                cache.put(cache_key, save_path)
+        logger.info("Successfully created %s in %.1f ms", save_path, stats.total * 1000)
+        return BuildResult(save_path, size, stats=stats, digest=stats.digest)
+    except AIAGeneratorError:
+        raise
+    except OSError as e:
+        raise BuildError(f"Failed to create .aia file: {str(e)}") from e
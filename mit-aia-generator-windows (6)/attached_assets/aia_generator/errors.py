@@ -0,0 +1,38 @@
+"""Exceptions raised by the AIA generator core.
+
+Each error also derives from the builtin exception the original script raised
+for the same condition, so existing ``except FileNotFoundError`` style
+handlers keep working.
+"""
+
+
+class AIAGeneratorError(Exception):
+    """Base class for all generator errors."""
+
+
+class InputValidationError(AIAGeneratorError, ValueError):
+    """Project inputs are missing or malformed."""
+
+
+class SavePathError(AIAGeneratorError, PermissionError):
+    """The output location cannot be written."""
+
+
+class ExtensionNotFoundError(AIAGeneratorError, FileNotFoundError):
+    """A selected .aix extension file does not exist."""
+
+
+class ExtensionError(AIAGeneratorError, ValueError):
+    """A selected .aix file is not a readable extension archive."""
+
+
+class BuildError(AIAGeneratorError, RuntimeError):
+    """The archive could not be produced or failed verification."""
+
+
+class BuildCancelled(AIAGeneratorError):
+    """The build was cancelled through BuildStats.cancel before it finished."""
+
+
+class ConfigError(AIAGeneratorError, OSError):
+    """The saved configuration could not be read or written."""
@@ -0,0 +1,134 @@
+"""Metadata of .aix extensions, read once per file and checked up front.
+
+An .aix is a zip holding one directory per extension package, each with a
+components.json (or, in older extensions, a component.json) describing its
+components.  read_packages returns the components' fully qualified types,
+which are what project.properties lists in external_comps.
+
+read_extension_info hashes an extension in bounded chunks, checks that it
+is a zip and reads its metadata; results are kept in small LRUs keyed on
+path, size and mtime, so re-selecting an unchanged file costs one stat.
+The digest memo is cache.stamped_digest, which BuildCache keys use too.
+ExtensionIngestor does the same for many files on a thread pool and
+reports each one through callbacks, which lets the GUI validate
+extensions as soon as they are picked instead of failing mid-build.
+"""
+
+import json
+import logging
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from .cache import stamped_digest
+from .errors import ExtensionError, ExtensionNotFoundError
+
+logger = logging.getLogger(__name__)
+
+METADATA_CACHE_SIZE = 64
+_METADATA_FILES = ("components.json", "component.json")
+
+@dataclass
+class ExtensionInfo:
+    """An extension file's digest and the component types it provides."""
+    path: str
+    name: str
+    digest: str
+    size: int
+    packages: list = field(default_factory=list)
+
+def read_packages(source):
+    """Fully qualified component types declared by the .aix at source (a path or seekable file)."""
+    try:
+        with zipfile.ZipFile(source) as zf:
+            packages = []
+            for info in zf.infolist():
+                directory, _, filename = info.filename.rpartition("/")
+                if filename not in _METADATA_FILES or "/" in directory:
+                    continue
+                descriptors = json.loads(zf.read(info).decode("utf-8"))
+                if isinstance(descriptors, dict):
+                    descriptors = [descriptors]
+                for descriptor in descriptors:
+                    package = descriptor.get("type") or directory
+                    if package and package not in packages:
+                        packages.append(package)
+    except (zipfile.BadZipFile, ValueError, AttributeError, KeyError, OSError) as e:
+        raise ExtensionError(f"Not a valid extension archive: {getattr(source, 'name', source)}: {str(e)}") from e
+    if not packages:
+        raise ExtensionError(f"No component metadata in extension archive: {getattr(source, 'name', source)}")
+    return packages
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError as e:
+        raise ExtensionNotFoundError(f"Extension file not found: {path}") from e
+    except OSError as e:
+        raise ExtensionError(f"Cannot read extension file: {path}: {str(e)}") from e
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns
+
+@lru_cache(maxsize=METADATA_CACHE_SIZE)
+def _cached_packages(path, size, mtime_ns):
+    return tuple(read_packages(path))
+
+def extension_packages(path):
+    """read_packages for the extension file at path, cached while the file is unchanged."""
+    return list(_cached_packages(*_stat(path)))
+
+def read_extension_info(path):
+    """Hash, check and describe the extension at path; raises ExtensionNotFoundError or ExtensionError."""
+    stamp = _stat(path)
+    try:
+        # Shared with BuildCache.extension_digest, so a later build does not hash the file again
+        digest = stamped_digest(*stamp)
+        packages = _cached_packages(*stamp)
+    except OSError as e:
+        raise ExtensionError(f"Cannot read extension file: {path}: {str(e)}") from e
+    return ExtensionInfo(path, os.path.splitext(os.path.basename(path))[0], digest, stamp[1], list(packages))
+
+class ExtensionIngestor:
+    """Reads extensions on a thread pool, reporting each one as it completes.
+
+    on_progress(done, total, info) and on_error(done, total, path, error)
+    are called from the worker threads; a GUI must hand them over to its
+    own thread (see gui.py).
+    """
+
+    def __init__(self, workers=None):
+        self._executor = ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1),
+                                            thread_name_prefix="aix-ingest")
+        self._lock = threading.Lock()
+
+    def submit(self, paths, on_progress=None, on_error=None):
+        """Start reading every path; returns the futures of their ExtensionInfos."""
+        total = len(paths)
+        done = [0]
+
+        def ingest(path):
+            try:
+                info = read_extension_info(path)
+            except Exception as e:
+                # Every failure reaches on_error, or the caller would wait on this path forever
+                logger.warning("Rejected extension %s: %s", path, e)
+                with self._lock:
+                    done[0] += 1
+                    count = done[0]
+                if on_error is not None:
+                    on_error(count, total, path, e)
+                raise
+            logger.info("Read extension %s: %s", path, ", ".join(info.packages))
+            with self._lock:
+                done[0] += 1
+                count = done[0]
+            if on_progress is not None:
+                on_progress(count, total, info)
+            return info
+
+        return [self._executor.submit(ingest, path) for path in paths]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
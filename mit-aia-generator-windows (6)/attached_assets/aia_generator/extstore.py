@@ -0,0 +1,166 @@
+"""Content-addressed store of .aix extensions kept pre-compressed.
+
+Each extension is read once, in chunks, and stored as a raw DEFLATE blob
+named by the SHA-256 of its contents, next to a small JSON record with its
+CRC and sizes.  Identical files selected from different paths share one
+blob.  Builds then copy the already-deflated bytes straight into every .aia
+(see ziputil.write_raw_member), so an extension is never recompressed and
+memory use does not grow with extension size.  A blob is only used for
+entries to be deflated at the store's own level; others are compressed
+from the source file, so a store never changes a build's output.  An
+extension only ever copied STORED is hashed for its CRC but never
+deflated, and gets no blob.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+import zipfile
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from .compression import effective_level
+from .errors import ExtensionNotFoundError
+from .ziputil import COPY_CHUNK_SIZE, write_raw_member
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class StoredExtension:
+    """Metadata of one extension; compress_size is None while it has no blob."""
+    digest: str
+    name: str
+    crc: int
+    file_size: int
+    compress_size: Optional[int]
+
+class ExtensionStore:
+    """Directory of {digest}.deflate blobs and {digest}.json records."""
+
+    def __init__(self, directory, compresslevel=zlib.Z_DEFAULT_COMPRESSION):
+        self.directory = directory
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        self._by_stat = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def blob_path(self, digest):
+        return os.path.join(self.directory, f"{digest}.deflate")
+
+    def _record_path(self, digest):
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, digest):
+        """Return the StoredExtension for digest, or None if it is not stored."""
+        try:
+            with open(self._record_path(digest), "r", encoding="utf-8") as f:
+                return StoredExtension(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def uses_blob(self, zinfo):
+        """Whether write_to_zip copies zinfo from a blob rather than from the source file."""
+        return (zinfo.compress_type == zipfile.ZIP_DEFLATED
+                and effective_level(zinfo._compresslevel) == effective_level(self.compresslevel))
+
+    def add(self, path, compress=True):
+        """Ingest the extension at path (once per path/size/mtime) and return its StoredExtension.
+
+        With compress=False only the digest, CRC and size are read and no
+        blob is written (unless one is already stored).
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError as e:
+            raise ExtensionNotFoundError(f"Extension file not found: {path}") from e
+        stamp = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            stored = self._by_stat.get(stamp)
+        if stored is not None and (stored.compress_size is not None or not compress):
+            return stored
+        stored = self._ingest(path, compress)
+        with self._lock:
+            self._by_stat[stamp] = stored
+        return stored
+
+    def _ingest(self, path, compress=True):
+        if not compress:
+            digest = hashlib.sha256()
+            crc = 0
+            file_size = 0
+            with open(path, "rb") as src:
+                for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    crc = zlib.crc32(chunk, crc)
+                    file_size += len(chunk)
+            digest = digest.hexdigest()
+            return self.get(digest) or StoredExtension(digest, os.path.basename(path), crc, file_size, None)
+        digest = hashlib.sha256()
+        crc = 0
+        file_size = 0
+        compress_size = 0
+        compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, -15)
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as dst, open(path, "rb") as src:
+                for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    crc = zlib.crc32(chunk, crc)
+                    file_size += len(chunk)
+                    data = compressor.compress(chunk)
+                    compress_size += len(data)
+                    dst.write(data)
+                data = compressor.flush()
+                compress_size += len(data)
+                dst.write(data)
+            digest = digest.hexdigest()
+            existing = self.get(digest)
+            if existing is not None:
+                os.remove(tmp_path)
+                logger.debug("Extension %s already stored as %s", path, digest)
+                return existing
+            os.replace(tmp_path, self.blob_path(digest))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        stored = StoredExtension(digest, os.path.basename(path), crc, file_size, compress_size)
+        # The record is written last; its presence marks the blob as complete
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(asdict(stored), f)
+        os.replace(tmp_path, self._record_path(digest))
+        logger.info("Stored extension %s as %s (%d -> %d bytes)", path, digest, file_size, compress_size)
+        return stored
+
+    def write_to_zip(self, zf, zinfo, stored, source_path):
+        """Copy an extension into zf as zinfo, raw from the store when it can.
+
+        A DEFLATED zinfo gets the stored blob when its level is the store's,
+        and is otherwise compressed from source_path; a STORED one gets the
+        bytes of source_path, whose CRC and size are already known from
+        ingestion.
+        """
+        zinfo.CRC = stored.crc
+        zinfo.file_size = stored.file_size
+        if zinfo.compress_type == zipfile.ZIP_DEFLATED and not self.uses_blob(zinfo):
+            logger.debug("Compressing %s: its blob is not at level %s", source_path, zinfo._compresslevel)
+            with open(source_path, "rb") as src, zf.open(zinfo, "w") as dst:
+                shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+            return
+        if zinfo.compress_type == zipfile.ZIP_STORED:
+            zinfo.compress_size = stored.file_size
+            raw_path = source_path
+        else:
+            if stored.compress_size is None:  # read with compress=False
+                stored = self.add(source_path)
+            zinfo.compress_type = zipfile.ZIP_DEFLATED
+            zinfo.compress_size = stored.compress_size
+            raw_path = self.blob_path(stored.digest)
+        with open(raw_path, "rb") as raw:
+            write_raw_member(zf, zinfo, raw)
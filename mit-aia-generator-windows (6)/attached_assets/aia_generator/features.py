@@ -0,0 +1,113 @@
+"""Declarative feature detection for free-text requirements.
+
+FEATURE_RULES maps each feature flag to the phrases that switch it on.  All
+phrases are compiled into a single regular expression shaped like a prefix
+trie, so parse_requirements finds every feature in one pass over the text
+however many rules there are.  The trie sits in a lookahead, so a match
+is tried at every word start and overlapping phrases ("speech to text
+message") are all found; a phrase also reports the features of the
+shorter phrases it begins with ("clock" inside "clock radio").  Phrases match whole words; a trailing "*"
+makes a phrase match as a word prefix ("list view*" also matches "list
+views"), and any run of whitespace in the text matches a phrase's spaces.
+Results are cached per requirements string.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+FeatureRule = namedtuple("FeatureRule", "name phrases")
+
+FEATURE_RULES = [
+    FeatureRule("use_list_view", ("list view*", "show results in list*")),
+    FeatureRule("play_sound", ("play a sound*",)),
+    FeatureRule("camera", ("camera", "take a photo", "take a picture", "take photos", "take pictures")),
+    FeatureRule("text_to_speech", ("text to speech", "text-to-speech", "tts", "read aloud", "speak the")),
+    FeatureRule("speech_recognition", ("speech recognition", "voice input", "voice command*", "speech to text")),
+    FeatureRule("clock", ("clock", "timer", "every second", "countdown")),
+    FeatureRule("tinydb", ("tinydb", "save data", "store locally", "remember the last", "persist*")),
+    FeatureRule("maps", ("map", "maps", "show location", "gps", "navigation")),
+    FeatureRule("location_sensor", ("location sensor", "current location", "gps")),
+    FeatureRule("accelerometer", ("accelerometer", "shake", "shaking")),
+    FeatureRule("barcode_scanner", ("barcode*", "qr code*", "scan a code")),
+    FeatureRule("notifier", ("notifier", "alert*", "pop up", "popup", "dialog")),
+    FeatureRule("web_viewer", ("web viewer", "webviewer", "show the page", "open the page")),
+    FeatureRule("sharing", ("share", "sharing")),
+    FeatureRule("texting", ("sms", "text message*")),
+    FeatureRule("phone_call", ("phone call*", "make a call")),
+    FeatureRule("email", ("email*", "e-mail*")),
+    FeatureRule("bluetooth", ("bluetooth",)),
+    FeatureRule("video", ("video*", "play a movie")),
+    FeatureRule("canvas", ("canvas", "draw*", "sprite*")),
+    FeatureRule("firebase", ("firebase", "cloud database", "clouddb")),
+]
+
+_WORD_END = ""
+_PREFIX_END = "*"
+_matcher = None
+_phrase_features = None
+
+def _trie_regex(phrases):
+    trie = {}
+    for phrase in phrases:
+        end = _PREFIX_END if phrase.endswith("*") else _WORD_END
+        node = trie
+        for ch in phrase.rstrip("*"):
+            node = node.setdefault(ch, {})
+        node[end] = True
+
+    def emit(node):
+        alternatives = [(r"\s+" if ch == " " else re.escape(ch)) + emit(child)
+                        for ch, child in sorted(node.items()) if ch not in (_WORD_END, _PREFIX_END)]
+        # Continuations come first so the longest phrase wins
+        if _WORD_END in node:
+            alternatives.append(r"\b")
+        if _PREFIX_END in node:
+            alternatives.append("")
+        return alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+
+    return r"\b" + emit(trie)
+
+def compile_rules(rules=None):
+    """(Re)build the combined matcher from rules (default FEATURE_RULES)."""
+    global _matcher, _phrase_features
+    rules = FEATURE_RULES if rules is None else rules
+    phrase_features = {}
+    prefixes = set()
+    for rule in rules:
+        for phrase in rule.phrases:
+            key = " ".join(phrase.lower().rstrip("*").split())
+            phrase_features.setdefault(key, set()).add(rule.name)
+            if phrase.endswith("*"):
+                prefixes.add(key)
+    phrases = {" ".join(p.lower().split()) for rule in rules for p in rule.phrases}
+    # The trie only reports the longest phrase at a position; add the ones it contains
+    _phrase_features = {
+        phrase: frozenset(name for other, names in phrase_features.items() for name in names
+                          if phrase.startswith(other) and (other == phrase or other in prefixes
+                                                           or not phrase[len(other)].isalnum()))
+        for phrase in phrase_features}
+    _matcher = re.compile("(?=(" + _trie_regex(sorted(phrases)) + "))")
+    _match_feature_names.cache_clear()
+
+def register_feature(name, phrases):
+    """Add phrases for a feature flag (a new or existing one) and recompile."""
+    FEATURE_RULES.append(FeatureRule(name, tuple(phrases)))
+    compile_rules()
+
+def feature_names():
+    return list(dict.fromkeys(rule.name for rule in FEATURE_RULES))
+
+@lru_cache(maxsize=1024)
+def _match_feature_names(requirements):
+    found = set()
+    for match in _matcher.finditer(requirements.lower()):
+        found |= _phrase_features[" ".join(match.group(1).split())]
+    return frozenset(found)
+
+def match_features(requirements):
+    """Return {feature name: bool} for every known feature, in one scan of requirements."""
+    found = _match_feature_names(requirements)
+    return {name: name in found for name in feature_names()}
+
+compile_rules()
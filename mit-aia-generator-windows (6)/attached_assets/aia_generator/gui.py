@@ -0,0 +1,260 @@
+"""Tkinter front end for the generator.
+
+tkinter is only imported when this module is, which the package and the CLI
+do lazily, so headless users never pay for it.
+
+Nothing slow runs on the Tk thread: extensions are read on an
+ExtensionIngestor and builds run one at a time on a worker thread, in the
+order they were requested.  Workers only put events on a queue, which the
+Tk thread drains every POLL_INTERVAL_MS to update the window.
+"""
+
+import logging
+import queue
+import tkinter as tk
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox, filedialog, scrolledtext
+
+from .config import load_config, save_config
+from .core import create_aia_file, validate_inputs
+from .errors import AIAGeneratorError, BuildCancelled, ConfigError, InputValidationError
+from .extinfo import ExtensionIngestor
+from .instrument import BuildStats
+
+
+logger = logging.getLogger(__name__)
+
+# How often the Tk thread picks up results from background workers
+POLL_INTERVAL_MS = 100
+
+class BuildJob:
+    """One requested build: its create_aia_file arguments and its BuildStats.
+
+    Each phase the build enters is posted to events as ("phase", (job, name)).
+    """
+
+    def __init__(self, inputs, extensions, save_path, events):
+        self.inputs = inputs
+        self.extensions = list(extensions)
+        self.save_path = save_path
+        self.stats = BuildStats(inputs[0], lambda phase: events.put(("phase", (self, phase))))
+        self.phase = None
+        self.future = None
+
+    @property
+    def project_name(self):
+        return self.inputs[0]
+
+class GeneratorWindow:
+    """The single-window generator form."""
+
+    def __init__(self, root):
+        self.root = root
+        self.extensions = []
+        self.extension_info = {}
+        self.pending_extensions = set()
+        self.ingestor = ExtensionIngestor()
+        self.events = queue.Queue()
+        self.builder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aia-build")
+        self.jobs = deque()
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
+        root.title("MIT App Inventor AIA Generator")
+        root.geometry("500x680")
+
+        # Load saved configuration
+        try:
+            config = load_config()
+        except ConfigError as e:
+            messagebox.showwarning("Config Error", str(e))
+            config = {}
+
+        # Labels and Entries
+        tk.Label(root, text="Project Name (e.g., SearchApp):").pack(pady=5)
+        self.project_name_entry = tk.Entry(root)
+        self.project_name_entry.pack()
+
+        tk.Label(root, text="MIT App Inventor User ID (e.g., serkac100):").pack(pady=5)
+        self.user_id_entry = tk.Entry(root)
+        self.user_id_entry.insert(0, config.get("user_id", ""))
+        self.user_id_entry.pack()
+
+        tk.Label(root, text="Google API Key:").pack(pady=5)
+        self.api_key_entry = tk.Entry(root)
+        self.api_key_entry.insert(0, config.get("api_key", ""))
+        self.api_key_entry.pack()
+
+        tk.Label(root, text="Custom Search Engine ID:").pack(pady=5)
+        self.cse_id_entry = tk.Entry(root)
+        self.cse_id_entry.insert(0, config.get("cse_id", ""))
+        self.cse_id_entry.pack()
+
+        tk.Label(root, text="Search Prompt (e.g., AI news):").pack(pady=5)
+        self.prompt_entry = tk.Entry(root)
+        self.prompt_entry.pack()
+
+        tk.Label(root, text="Functional Requirements (e.g., play a sound, list view):").pack(pady=5)
+        self.requirements_text = scrolledtext.ScrolledText(root, height=5, wrap=tk.WORD)
+        self.requirements_text.pack()
+
+        tk.Label(root, text="Extensions (.aix files):").pack(pady=5)
+        self.extensions_label = tk.Label(root, text="No extensions selected")
+        self.extensions_label.pack()
+        tk.Button(root, text="Add Extensions", command=self.add_extensions).pack()
+
+        # Generate Button
+        tk.Button(root, text="Generate AIA File", command=self.on_generate).pack(pady=(20, 5))
+        self.status_label = tk.Label(root, text="Idle")
+        self.status_label.pack()
+        self.cancel_button = tk.Button(root, text="Cancel", command=self.on_cancel, state=tk.DISABLED)
+        self.cancel_button.pack(pady=5)
+
+        self.root.after(POLL_INTERVAL_MS, self.poll_events)
+
+    def add_extensions(self):
+        """Open file dialog to select .aix extension files and read them in the background."""
+        files = filedialog.askopenfilenames(filetypes=[("AIX files", "*.aix")])
+        files = [path for path in files if path not in self.extensions]
+        if files:
+            self.extensions.extend(files)
+            self.pending_extensions.update(files)
+            logger.info("Added extensions: %s", self.extensions)
+            # Runs on the ingest threads: only hand the results over to the Tk thread
+            self.ingestor.submit(files, on_progress=lambda done, total, info: self.events.put(("extension", info)),
+                                 on_error=lambda done, total, path, error: self.events.put(("extension_error", (path, error))))
+            self.update_extensions_label()
+        return self.extensions
+
+    def update_extensions_label(self):
+        if self.pending_extensions:
+            text = f"Reading {len(self.pending_extensions)} of {len(self.extensions)} extension(s)..."
+        elif self.extensions:
+            packages = [package for path in self.extensions for package in self.extension_info[path].packages]
+            text = f"Selected: {len(self.extensions)} extension(s): {', '.join(packages)}"
+        else:
+            text = "No extensions selected"
+        self.extensions_label.config(text=text)
+
+    def update_status(self):
+        if not self.jobs:
+            self.status_label.config(text="Idle")
+            self.cancel_button.config(state=tk.DISABLED)
+            return
+        job = self.jobs[0]
+        text = f"Building {job.project_name}: {job.phase}" if job.phase else f"Waiting to build {job.project_name}"
+        if len(self.jobs) > 1:
+            text += f" ({len(self.jobs) - 1} more queued)"
+        self.status_label.config(text=text)
+        self.cancel_button.config(state=tk.NORMAL)
+
+    def poll_events(self):
+        """Apply results posted by background workers; rescheduled on the Tk event loop."""
+        while True:
+            try:
+                kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "extension":
+                self.pending_extensions.discard(payload.path)
+                self.extension_info[payload.path] = payload
+                self.update_extensions_label()
+            elif kind == "extension_error":
+                path, error = payload
+                self.pending_extensions.discard(path)
+                self.extensions.remove(path)
+                self.update_extensions_label()
+                messagebox.showwarning("Extension Error", str(error))
+            elif kind == "phase":
+                job, phase = payload
+                job.phase = phase
+                self.update_status()
+            elif kind == "done":
+                job, result, error = payload
+                self.finish_build(job, result, error)
+        self.root.after(POLL_INTERVAL_MS, self.poll_events)
+
+    def on_cancel(self):
+        """Cancel the running build; builds queued after it still run."""
+        if self.jobs:
+            job = self.jobs[0]
+            logger.info("Cancelling build of %s", job.save_path)
+            job.stats.cancel()
+            self.status_label.config(text=f"Cancelling {job.project_name}...")
+
+    def on_close(self):
+        for job in self.jobs:
+            job.stats.cancel()
+        self.ingestor.shutdown(wait=False)
+        self.builder.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
+    def read_inputs(self):
+        project_name = self.project_name_entry.get().strip()
+        user_id = self.user_id_entry.get().strip()
+        api_key = self.api_key_entry.get().strip()
+        cse_id = self.cse_id_entry.get().strip()
+        search_prompt = self.prompt_entry.get().strip()
+        requirements = self.requirements_text.get("1.0", tk.END).strip()
+        try:
+            validate_inputs(project_name, user_id, api_key, cse_id, search_prompt)
+        except InputValidationError as e:
+            messagebox.showwarning("Input Error", str(e))
+            return None
+        logger.info("Validated inputs: project_name=%s, user_id=%s, search_prompt=%s, requirements=%s",
+                    project_name, user_id, search_prompt, requirements)
+        return project_name, user_id, api_key, cse_id, search_prompt, requirements
+
+    def on_generate(self):
+        inputs = self.read_inputs()
+        if not inputs:
+            return
+        if self.pending_extensions:
+            messagebox.showwarning("Extensions", "Extensions are still being read, try again in a moment.")
+            return
+        save_path = filedialog.asksaveasfilename(defaultextension=".aia", filetypes=[("AIA files", "*.aia")])
+        if not save_path:
+            return
+        logger.info("Selected save path: %s", save_path)
+        job = BuildJob(inputs, self.extensions, save_path, self.events)
+        job.future = self.builder.submit(self.run_build, job)
+        self.jobs.append(job)
+        self.update_status()
+
+    def run_build(self, job):
+        """Build one job on the worker thread, reporting back through self.events."""
+        result = error = None
+        try:
+            job.stats.checkpoint()
+            result = create_aia_file(*job.inputs, job.extensions, job.save_path, stats=job.stats)
+        except AIAGeneratorError as e:
+            error = e
+        except Exception as e:
+            logger.exception("Unexpected error building %s", job.save_path)
+            error = e
+        self.events.put(("done", (job, result, error)))
+
+    def finish_build(self, job, result, error):
+        self.jobs.remove(job)
+        self.update_status()
+        if isinstance(error, BuildCancelled):
+            logger.info("Cancelled build of %s", job.save_path)
+            return
+        if error is not None:
+            messagebox.showerror("Error", f"Failed to create .aia file: {str(error)}")
+            logger.error("Error: %s", error)
+            return
+        _, user_id, api_key, cse_id = job.inputs[:4]
+        try:
+            save_config(user_id, api_key, cse_id)
+        except ConfigError as e:
+            messagebox.showwarning("Config Error", str(e))
+        messagebox.showinfo("Success", f"Created {result.path}")
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    root = tk.Tk()
+    GeneratorWindow(root)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Build timing instrumentation.
+
+Every build records wall-clock time per phase (validation,
+parse_requirements, render, zip, extensions, verify, ...) in a BuildStats,
+which create_aia_file returns on its BuildResult, along with each screen's
+render time.  Stats can be written as
+JSON lines, or aggregated into per-phase histograms with PhaseMetrics and
+exported in the Prometheus text format.
+
+A BuildStats also lets another thread follow and stop a running build: its
+listener is told the name of each phase as it starts, and after cancel()
+the build raises BuildCancelled at its next checkpoint (between entries,
+and between chunks of a streamed extension).
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from .errors import BuildCancelled
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class BuildStats:
+    """Per-phase timings (seconds), per-screen render times and counters of one build.
+
+    digest is the SHA-256 of the archive the build wrote, once it is done.
+    """
+
+    __slots__ = ("project_name", "phases", "counters", "screens", "listener", "cancelled", "digest")
+
+    def __init__(self, project_name="", listener=None):
+        self.project_name = project_name
+        self.phases = {}
+        self.counters = {}
+        self.screens = {}
+        self.listener = listener
+        self.cancelled = False
+        self.digest = None
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block, adding to any earlier time for name."""
+        if self.listener is not None:
+            self.listener(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    @classmethod
+    def from_phases(cls, project_name, phases, counters=None, screens=None):
+        stats = cls(project_name)
+        stats.phases = dict(phases)
+        stats.counters = dict(counters or {})
+        stats.screens = dict(screens or {})
+        return stats
+
+    def cancel(self):
+        """Ask the build using these stats to stop; safe to call from any thread."""
+        self.cancelled = True
+
+    def checkpoint(self):
+        if self.cancelled:
+            raise BuildCancelled(f"Build of {self.project_name} was cancelled")
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @property
+    def total(self):
+        return sum(self.phases.values())
+
+    def as_dict(self):
+        return {"project_name": self.project_name, "total": self.total, "phases": dict(self.phases),
+                "counters": dict(self.counters), "screens": dict(self.screens)}
+
+    def to_json_line(self):
+        return json.dumps(self.as_dict(), separators=(",", ":"))
+
+    def __repr__(self):
+        phases = ", ".join(f"{name}={seconds * 1000:.2f}ms" for name, seconds in self.phases.items())
+        return f"BuildStats({self.project_name!r}, {phases})"
+
+def write_json_lines(stats_list, fp):
+    """Append one JSON object per BuildStats to a text stream."""
+    for stats in stats_list:
+        fp.write(stats.to_json_line() + "\n")
+
+class PhaseMetrics:
+    """Thread-safe aggregate of many BuildStats as per-phase histograms."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix="aia_build"):
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.builds = 0
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, stats):
+        with self._lock:
+            self.builds += 1
+            for name, seconds in list(stats.phases.items()) + [("total", stats.total)]:
+                counts, total, observed = self._histograms.get(name, ([0] * len(self.buckets), 0.0, 0))
+                for i, bound in enumerate(self.buckets):
+                    if seconds <= bound:
+                        counts[i] += 1
+                self._histograms[name] = (counts, total + seconds, observed + 1)
+            for name, amount in stats.counters.items():
+                self._counters[name] = self._counters.get(name, 0) + amount
+
+    def prometheus_text(self):
+        """Render the histograms in the Prometheus text exposition format."""
+        metric = f"{self.prefix}_phase_seconds"
+        lines = [f"# HELP {self.prefix}_builds_total Builds observed.",
+                 f"# TYPE {self.prefix}_builds_total counter"]
+        with self._lock:
+            lines.append(f"{self.prefix}_builds_total {self.builds}")
+            lines += [f"# HELP {metric} Wall-clock time spent in each build phase.", f"# TYPE {metric} histogram"]
+            for name, (counts, total, observed) in self._histograms.items():
+                for bound, count in zip(self.buckets, counts):
+                    lines.append(f'{metric}_bucket{{phase="{name}",le="{bound}"}} {count}')
+                lines.append(f'{metric}_bucket{{phase="{name}",le="+Inf"}} {observed}')
+                lines.append(f'{metric}_sum{{phase="{name}"}} {total}')
+                lines.append(f'{metric}_count{{phase="{name}"}} {observed}')
+            for name, amount in self._counters.items():
+                lines.append(f"# TYPE {self.prefix}_{name}_total counter")
+                lines.append(f"{self.prefix}_{name}_total {amount}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,393 @@
+"""Typed in-memory model of an App Inventor project.
+
+Project, Form, Component, Block, Input, Element and Property are small
+__slots__ classes, so a parsed project costs a fraction of the equivalent dicts and strings,
+and type, component and property names are interned and shared between
+projects.  Each file format is read and written in one pass:
+
+    Project.from_properties / to_properties   project.properties
+    Form.from_scm / to_scm                    Screen .scm ($JSON)
+    Form.read_bky / to_bky                    Screen .bky (Blockly XML)
+    Project.from_aia / to_entries             a whole .aia
+
+$Version and Uuid are ints in the model and strings on disk.  Compact
+output (compact=True) re-serializes generated files byte for byte; the
+indented form is a canonical layout.
+"""
+
+import json
+import sys
+import zipfile
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape as xml_escape, quoteattr
+
+_intern = sys.intern
+_BKY_NAMESPACE = "http://www.w3.org/1999/xhtml"
+_PROPERTIES_PATH = "youngandroidproject/project.properties"
+
+def _attrs(element):
+    return tuple((_intern(name), value) for name, value in element.attrib.items())
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+def _open_tag(tag, attrs):
+    return "<" + tag + "".join(f" {name}={quoteattr(str(value))}" for name, value in attrs) + ">"
+
+class Property:
+    """A named value: a designer property, a project setting or a block field."""
+
+    __slots__ = ("name", "value")
+
+    def __init__(self, name, value):
+        self.name = _intern(name)
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Property) and (self.name, self.value) == (other.name, other.value)
+
+    def __repr__(self):
+        return f"Property({self.name!r}, {self.value!r})"
+
+class Component:
+    """A designer component and its children."""
+
+    __slots__ = ("name", "type", "version", "uuid", "properties", "components")
+
+    def __init__(self, name, type, version=1, uuid=None, properties=(), components=()):
+        self.name = _intern(name)
+        self.type = _intern(type)
+        self.version = version
+        self.uuid = uuid
+        self.properties = tuple(properties)
+        self.components = tuple(components)
+
+    def get(self, name, default=None):
+        for prop in self.properties:
+            if prop.name == name:
+                return prop.value
+        return default
+
+    def walk(self):
+        """This component and all its descendants, depth first."""
+        yield self
+        for child in self.components:
+            yield from child.walk()
+
+    @classmethod
+    def from_dict(cls, data):
+        properties = [Property(key, value) for key, value in data.items()
+                      if key not in ("$Name", "$Type", "$Version", "Uuid", "$Components")]
+        uuid = data.get("Uuid")
+        return cls(data["$Name"], data["$Type"], int(data.get("$Version", 1)),
+                   int(uuid) if uuid is not None else None, properties,
+                   [Component.from_dict(child) for child in data.get("$Components", ())])
+
+    def to_dict(self):
+        data = {"$Name": self.name, "$Type": self.type, "$Version": str(self.version)}
+        for prop in self.properties:
+            data[prop.name] = prop.value
+        if self.uuid is not None:
+            data["Uuid"] = str(self.uuid)
+        if self.components:
+            data["$Components"] = [child.to_dict() for child in self.components]
+        return data
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r}, {self.type!r}, {len(self.components)} children)"
+
+class Input:
+    """A block's value or statement socket and the block plugged into it (or None)."""
+
+    __slots__ = ("kind", "name", "block")
+
+    def __init__(self, kind, name, block=None):
+        self.kind = kind
+        self.name = _intern(name)
+        self.block = block
+
+    def __repr__(self):
+        return f"Input({self.kind!r}, {self.name!r}, {self.block!r})"
+
+class Element:
+    """Any other XML element inside a block (<comment>, <data>, ...), kept as is."""
+
+    __slots__ = ("tag", "attrs", "text", "children")
+
+    def __init__(self, tag, attrs=(), text="", children=()):
+        self.tag = _intern(tag)
+        self.attrs = tuple(attrs)
+        self.text = text
+        self.children = tuple(children)
+
+    @classmethod
+    def from_element(cls, element):
+        return cls(_local(element.tag), _attrs(element), element.text or "",
+                   [cls.from_element(child) for child in element])
+
+    def write_xml(self, out):
+        out.append(_open_tag(self.tag, self.attrs) + xml_escape(self.text))
+        for child in self.children:
+            child.write_xml(out)
+        out.append(f"</{self.tag}>")
+
+    def __repr__(self):
+        return f"Element({self.tag!r})"
+
+class Block:
+    """A Blockly block: its attributes, mutation, fields, inputs and next block.
+
+    children holds the block's fields (Property), inputs (Input) and any
+    other elements (Element) in document order; mutation is None or
+    (attrs, children) with children as (tag, attrs).  tag is "block" or
+    "shadow".
+    """
+
+    __slots__ = ("type", "attrs", "mutation", "children", "next", "tag")
+
+    def __init__(self, type, attrs=(), mutation=None, children=(), next=None, tag="block"):
+        self.type = _intern(type)
+        self.attrs = tuple(attrs)
+        self.mutation = mutation
+        self.children = tuple(children)
+        self.next = next
+        self.tag = tag
+
+    @property
+    def fields(self):
+        return tuple(child for child in self.children if isinstance(child, Property))
+
+    @property
+    def inputs(self):
+        return tuple(child for child in self.children if isinstance(child, Input))
+
+    def walk(self):
+        """This block and every block nested in or following it."""
+        block = self
+        while block is not None:
+            yield block
+            for child in block.children:
+                if isinstance(child, Input) and child.block is not None:
+                    yield from child.block.walk()
+            block = block.next
+
+    def field(self, name, default=None):
+        for child in self.children:
+            if isinstance(child, Property) and child.name == name:
+                return child.value
+        return default
+
+    def component_ids(self):
+        """Names of the components this block and its nested blocks refer to."""
+        for block in self.walk():
+            if block.mutation is not None:
+                for name, value in block.mutation[0]:
+                    if name == "component_id":
+                        yield value
+            component_id = block.field("component_id")
+            if component_id is not None:
+                yield component_id
+
+    @classmethod
+    def from_element(cls, element):
+        type_ = element.get("type")
+        attrs = tuple((name, value) for name, value in _attrs(element) if name != "type")
+        mutation, children, next_block = None, [], None
+        for child in element:
+            tag = _local(child.tag)
+            if tag == "mutation":
+                mutation = (_attrs(child), tuple((_intern(_local(grandchild.tag)), _attrs(grandchild))
+                                                 for grandchild in child))
+            elif tag == "field":
+                children.append(Property(child.get("name"), child.text or ""))
+            elif tag in ("value", "statement"):
+                nested = next((grandchild for grandchild in child if _local(grandchild.tag) in ("block", "shadow")), None)
+                children.append(Input(tag, child.get("name"), cls.from_element(nested) if nested is not None else None))
+            elif tag == "next":
+                nested = next((grandchild for grandchild in child if _local(grandchild.tag) == "block"), None)
+                next_block = cls.from_element(nested) if nested is not None else None
+            else:
+                children.append(Element.from_element(child))
+        return cls(type_, attrs, mutation, children, next_block, _local(element.tag))
+
+    def write_xml(self, out, indent=None, depth=0):
+        """Append this block's XML to the list out; indent=None writes it compact."""
+        pad = "" if indent is None else "\n" + indent * depth
+        inner = "" if indent is None else "\n" + indent * (depth + 1)
+        nested = "" if indent is None else "\n" + indent * (depth + 2)
+        out.append(_open_tag(self.tag, (("type", self.type),) + self.attrs))
+        if self.mutation is not None:
+            attrs, children = self.mutation
+            out.append(inner + _open_tag("mutation", attrs))
+            for tag, child_attrs in children:
+                out.append(_open_tag(tag, child_attrs) + f"</{tag}>")
+            out.append("</mutation>")
+        for child in self.children:
+            if isinstance(child, Property):
+                out.append(inner + _open_tag("field", (("name", child.name),)) + xml_escape(child.value) + "</field>")
+                continue
+            if isinstance(child, Element):
+                out.append(inner)
+                child.write_xml(out)
+                continue
+            out.append(inner + _open_tag(child.kind, (("name", child.name),)))
+            if child.block is not None:
+                out.append(nested)
+                child.block.write_xml(out, indent, depth + 2)
+            out.append(inner + f"</{child.kind}>")
+        if self.next is not None:
+            out.append(inner + "<next>" + nested)
+            self.next.write_xml(out, indent, depth + 2)
+            out.append(inner + "</next>")
+        out.append(pad + f"</{self.tag}>")
+
+    def __repr__(self):
+        return f"Block({self.type!r}, {len(self.children)} children)"
+
+class Form(Component):
+    """A screen: its designer tree (.scm) and its blocks workspace (.bky).
+
+    App Inventor writes the top-level blocks next to an empty <yacodeblocks>
+    element; the generator nests them inside it.  nested_blocks records
+    which layout the .bky used, and to_bky writes the same one back.
+    """
+
+    __slots__ = ("header", "blocks", "workspace", "nested_blocks")
+
+    def __init__(self, name, type="Form", version=1, uuid=0, properties=(), components=(),
+                 header=(), blocks=(), workspace=(), nested_blocks=True):
+        super().__init__(name, type, version, uuid, properties, components)
+        self.header = tuple(header)
+        self.blocks = tuple(blocks)
+        self.workspace = tuple(workspace)
+        self.nested_blocks = nested_blocks
+
+    @classmethod
+    def from_scm(cls, text):
+        text = text.strip()
+        if not text.startswith("#|") or not text.endswith("|#") or not text[2:-2].strip().startswith("$JSON"):
+            raise ValueError("not a $JSON .scm file")
+        data = json.loads(text[2:-2].strip()[len("$JSON"):])
+        root = Component.from_dict(data["Properties"])
+        header = [Property(key, value) for key, value in data.items() if key != "Properties"]
+        return cls(root.name, root.type, root.version, root.uuid, root.properties, root.components, header)
+
+    def to_scm(self, compact=False):
+        data = {prop.name: prop.value for prop in self.header}
+        data["Properties"] = self.to_dict()
+        body = json.dumps(data, separators=(",", ":")) if compact else json.dumps(data, indent=2)
+        return f"#|\n$JSON\n{body}\n|#"
+
+    def read_bky(self, text):
+        """Load the blocks workspace from .bky XML into this form; returns self.
+
+        Top-level blocks are read both from the root and from inside
+        <yacodeblocks>; other top-level elements are skipped.
+        """
+        root = ElementTree.fromstring(text)
+        workspace = next((child for child in root if _local(child.tag) == "yacodeblocks"), None)
+        outer = [child for child in root if _local(child.tag) in ("block", "shadow")]
+        inner = [child for child in workspace if _local(child.tag) in ("block", "shadow")] if workspace is not None else []
+        self.workspace = _attrs(workspace) if workspace is not None else ()
+        self.nested_blocks = bool(inner) or not outer
+        self.blocks = tuple(Block.from_element(child) for child in outer + inner)
+        return self
+
+    def to_bky(self, compact=False):
+        indent = None if compact else "  "
+        depth = 2 if self.nested_blocks else 1
+        line = "" if compact else "\n  "
+        out = [f'<xml xmlns="{_BKY_NAMESPACE}">']
+        if self.nested_blocks:
+            out.append(line + _open_tag("yacodeblocks", self.workspace))
+        for block in self.blocks:
+            out.append("" if compact else "\n" + indent * depth)
+            block.write_xml(out, indent, depth)
+        if self.nested_blocks:
+            out.append(line + "</yacodeblocks>")
+        else:
+            out.append(line + _open_tag("yacodeblocks", self.workspace) + "</yacodeblocks>")
+        out.append(("" if compact else "\n") + "</xml>")
+        return "".join(out)
+
+    def component(self, name):
+        return next((component for component in self.walk() if component.name == name), None)
+
+class Project:
+    """project.properties plus the project's forms, keyed by screen name."""
+
+    __slots__ = ("name", "user_id", "properties", "comments", "forms", "assets")
+
+    def __init__(self, name, user_id="", properties=(), comments=(), forms=(), assets=()):
+        self.name = name
+        self.user_id = user_id
+        self.properties = tuple(properties)
+        self.comments = tuple(comments)
+        self.forms = {form.name: form for form in forms}
+        self.assets = tuple(assets)
+
+    def get(self, name, default=None):
+        for prop in self.properties:
+            if prop.name == name:
+                return prop.value
+        return default
+
+    @classmethod
+    def from_properties(cls, text, name=None, user_id=""):
+        properties, comments = [], []
+        for line in text.splitlines():
+            if line.startswith("#"):
+                comments.append(line)
+            elif "=" in line:
+                key, value = line.split("=", 1)
+                properties.append(Property(key, value))
+        project = cls(name or "", user_id, properties, comments)
+        project.name = name or project.get("name", "")
+        return project
+
+    def to_properties(self):
+        return "".join(line + "\n" for line in self.comments) + "".join(
+            f"{prop.name}={prop.value}\n" for prop in self.properties)
+
+    @classmethod
+    def from_aia(cls, source):
+        """Load a whole .aia (a path, file object or open ZipFile) in one pass over its members."""
+        zf = source if isinstance(source, zipfile.ZipFile) else zipfile.ZipFile(source)
+        try:
+            names = zf.namelist()
+            properties_path = next(name for name in names if name.endswith(_PROPERTIES_PATH))
+            root = properties_path[:-len(_PROPERTIES_PATH)]
+            project = cls.from_properties(zf.read(properties_path).decode("utf-8"))
+            project.name = project.name or root.strip("/")
+            bky = {}
+            assets = []
+            for name in names:
+                relpath = name[len(root):]
+                if relpath.startswith("src/") and relpath.endswith(".scm"):
+                    form = Form.from_scm(zf.read(name).decode("utf-8"))
+                    project.forms[form.name] = form
+                    project.user_id = project.user_id or relpath.split("/")[2].replace("ai_", "", 1)
+                elif relpath.startswith("src/") and relpath.endswith(".bky"):
+                    bky[relpath.rsplit("/", 1)[-1][:-len(".bky")]] = name
+                elif relpath.startswith("assets/") and not relpath.endswith("/"):
+                    assets.append(relpath)
+            for form_name, name in bky.items():
+                if form_name in project.forms:
+                    project.forms[form_name].read_bky(zf.read(name))
+            project.assets = tuple(assets)
+            return project
+        finally:
+            if zf is not source:
+                zf.close()
+
+    def to_entries(self, compact=False):
+        """The generated text files as {path relative to the project root: bytes}; assets are not included."""
+        prefix = f"src/appinventor/ai_{self.user_id}/{self.name}"
+        entries = {_PROPERTIES_PATH: self.to_properties().encode("utf-8")}
+        for form in self.forms.values():
+            entries[f"{prefix}/{form.name}.scm"] = form.to_scm(compact).encode("utf-8")
+            entries[f"{prefix}/{form.name}.bky"] = form.to_bky(compact).encode("utf-8")
+        return entries
+
+    def __repr__(self):
+        return f"Project({self.name!r}, forms={list(self.forms)})"
@@ -0,0 +1,143 @@
+"""Feature plugins: what each app feature adds to the generated project.
+
+A FeaturePlugin names the components (COMPONENTS templates) and blocks
+(BLOCKS templates) a feature contributes, the asset files it ships, the
+extension it needs and the plugins it builds on.  PLUGINS.resolve turns a
+parse_requirements() result into a FeaturePlan: the enabled plugins in
+dependency order, with component Uuids and block positions allocated and
+every template pre-bound.  Plans are cached per set of enabled plugins, so
+a build only fills in the per-project slots (search_prompt, api_key, ...).
+"""
+
+import zlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Optional
+
+from .errors import BuildError
+from .templates import BLOCKS, COMPONENTS
+
+BLOCK_X = 50
+BLOCK_Y = 50
+_UUID_SPACE = 900000000
+
+def flag(name):
+    """Predicate enabling a plugin when the parse_requirements flag name is set."""
+    return lambda features: bool(features.get(name))
+
+def without(name):
+    """Predicate enabling a plugin when the parse_requirements flag name is not set."""
+    return lambda features: not features.get(name)
+
+@dataclass(frozen=True)
+class FeaturePlugin:
+    name: str
+    components: tuple = ()
+    blocks: tuple = ()
+    assets: dict = field(default_factory=dict)
+    extension: Optional[str] = None
+    requires: tuple = ()
+    when: Optional[Callable] = None
+
+    def enabled(self, features):
+        return self.when is None or self.when(features)
+
+@dataclass
+class FeaturePlan:
+    plugins: tuple
+    components: tuple
+    blocks: tuple
+    assets: tuple
+    extensions: tuple
+    uuids: dict
+
+def component_uuid(name, taken=()):
+    """Stable App Inventor style Uuid for a component name, skipping values in taken."""
+    value = zlib.crc32(name.encode("utf-8")) % _UUID_SPACE
+    while str(-(value + 100000000)) in taken:
+        value = (value + 1) % _UUID_SPACE
+    return str(-(value + 100000000))
+
+class PluginRegistry:
+    """Feature plugins in registration order, resolved into cached FeaturePlans."""
+
+    def __init__(self):
+        self._plugins = {}
+        self._plan = lru_cache(maxsize=256)(self._build_plan)
+
+    def register(self, plugin):
+        for name in plugin.components:
+            COMPONENTS.get(name)
+        for name in plugin.blocks:
+            BLOCKS.get(name)
+        self._plugins[plugin.name] = plugin
+        self._plan.cache_clear()
+        return plugin
+
+    def __contains__(self, name):
+        return name in self._plugins
+
+    def names(self):
+        return list(self._plugins)
+
+    def asset_paths(self):
+        """Paths of every asset some plugin can add, enabled or not."""
+        return {path for plugin in self._plugins.values() for path in plugin.assets}
+
+    def resolve(self, features, compact=False):
+        """FeaturePlan for the plugins enabled by features, plus everything they require."""
+        enabled = [name for name, plugin in self._plugins.items() if plugin.enabled(features)]
+        return self._plan(tuple(self._dependency_order(enabled)), compact)
+
+    def _dependency_order(self, names):
+        ordered, visiting, done = [], set(), set()
+
+        def visit(name, needed_by):
+            if name in done:
+                return
+            if name not in self._plugins:
+                raise BuildError(f"Feature plugin {needed_by} requires unknown plugin {name}")
+            if name in visiting:
+                raise BuildError(f"Feature plugin dependency cycle through {name}")
+            visiting.add(name)
+            for required in self._plugins[name].requires:
+                visit(required, name)
+            visiting.discard(name)
+            done.add(name)
+            ordered.append(name)
+
+        for name in names:
+            visit(name, name)
+        return ordered
+
+    def _build_plan(self, names, compact):
+        plugins = [self._plugins[name] for name in names]
+        components, blocks, assets, uuids = [], [], {}, {}
+        y = BLOCK_Y
+        for plugin in plugins:
+            for name in plugin.components:
+                if name in uuids:
+                    raise BuildError(f"Component {name} is added by more than one feature plugin")
+                uuids[name] = component_uuid(name, uuids.values())
+                components.append(COMPONENTS.get(name, compact).bind(uuid=uuids[name]))
+            for name in plugin.blocks:
+                blocks.append(BLOCKS.get(name, compact).bind(x=str(BLOCK_X), y=str(y)))
+                y += BLOCKS.height(name)
+            assets.update(plugin.assets)
+        extensions = tuple(dict.fromkeys(plugin.extension for plugin in plugins if plugin.extension))
+        return FeaturePlan(tuple(names), tuple(components), tuple(blocks), tuple(assets.items()), extensions, uuids)
+
+PLUGINS = PluginRegistry()
+
+def register_plugin(name, components=(), blocks=(), assets=None, extension=None, requires=(), when=None):
+    """Register a feature plugin on PLUGINS; see FeaturePlugin."""
+    return PLUGINS.register(FeaturePlugin(name, tuple(components), tuple(blocks), dict(assets or {}), extension,
+                                          tuple(requires), when))
+
+register_plugin("search", components=("SearchBox", "SearchButton", "Web1"), blocks=("search_click",))
+register_plugin("results_list", components=("ResultListView",), blocks=("got_text_list_view",),
+                requires=("search",), when=flag("use_list_view"))
+register_plugin("results_label", components=("ResultLabel",), blocks=("got_text_label",),
+                requires=("search",), when=without("use_list_view"))
+register_plugin("sound", components=("SoundButton", "Sound1"), blocks=("sound_click",),
+                assets={"assets/sample_sound.mp3": b""}, when=flag("play_sound"))  # Placeholder sound
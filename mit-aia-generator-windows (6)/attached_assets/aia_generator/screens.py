@@ -0,0 +1,99 @@
+"""Multi-screen projects.
+
+A project is a list of ScreenSpecs; the first one is the app's main screen
+(project.properties main=...).  Each screen has its own requirements, and
+so its own feature plugins, components and blocks.  iter_rendered_screens
+renders the screens on a thread pool and yields them in screen order, each
+as soon as it and the screens before it are ready, so the caller can zip
+(and deflate, which releases the GIL) finished screens while the rest are
+still rendering.
+"""
+
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from .errors import InputValidationError
+from .features import match_features
+from .plugins import PLUGINS
+from .templates import render_bky, render_scm
+
+_SCREEN_NAME_RE = re.compile(r"[A-Za-z][A-Za-z0-9_]*\Z")
+
+@dataclass
+class ScreenSpec:
+    """One screen; search_prompt and title default to the project's."""
+    name: str
+    requirements: str = ""
+    search_prompt: Optional[str] = None
+    title: Optional[str] = None
+
+@dataclass
+class RenderedScreen:
+    name: str
+    scm: bytes
+    bky: bytes
+    seconds: float
+
+def normalize_screens(screens):
+    """Validate screens (ScreenSpecs or dicts) into ScreenSpecs; None means a single Screen1."""
+    if not screens:
+        return [ScreenSpec("Screen1")]
+    normalized = []
+    for screen in screens:
+        if isinstance(screen, dict):
+            try:
+                screen = ScreenSpec(**screen)
+            except TypeError as e:
+                raise InputValidationError(f"Invalid screen spec {screen!r}: {str(e)}") from e
+        elif not isinstance(screen, ScreenSpec):
+            raise InputValidationError(f"Invalid screen spec {screen!r}: expected an object or ScreenSpec")
+        for key, value in asdict(screen).items():
+            if not isinstance(value, str) and (value is not None or key in ("name", "requirements")):
+                raise InputValidationError(f"Invalid screen spec {screen!r}: {key} must be a string")
+        if not _SCREEN_NAME_RE.match(screen.name or ""):
+            raise InputValidationError(f"Invalid screen name {screen.name!r}: use letters, digits and _, "
+                                       "starting with a letter")
+        if screen.name in (other.name for other in normalized):
+            raise InputValidationError(f"Duplicate screen name {screen.name}")
+        normalized.append(screen)
+    return normalized
+
+def screens_key(screens):
+    """JSON-serializable form of screens, for cache keys."""
+    return [asdict(screen) for screen in normalize_screens(screens)] if screens else None
+
+def screen_plans(screens, compact=False):
+    """FeaturePlan for each screen, from its own requirements."""
+    return [PLUGINS.resolve(match_features(screen.requirements), compact) for screen in screens]
+
+def render_screen(screen, plan, project_name, values, compact=False):
+    start = time.perf_counter()
+    values = dict(values)
+    if screen.search_prompt is not None:
+        values["search_prompt"] = screen.search_prompt
+    components = [template.render(**values) for template in plan.components]
+    blocks = [template.render(**values) for template in plan.blocks]
+    title = screen.title or (None if screen.name == "Screen1" else screen.name)
+    scm = render_scm(components, project_name, compact, screen.name, title).encode("utf-8")
+    bky = render_bky(blocks, compact).encode("utf-8")
+    return RenderedScreen(screen.name, scm, bky, time.perf_counter() - start)
+
+def iter_rendered_screens(screens, plans, project_name, values, compact=False, workers=None):
+    """Yield a RenderedScreen per screen, in screen order, rendering up to workers screens in parallel.
+
+    Screen order keeps the archive layout independent of thread scheduling.
+    """
+    workers = workers or min(len(screens), os.cpu_count() or 1)
+    if workers <= 1 or len(screens) == 1:
+        for screen, plan in zip(screens, plans):
+            yield render_screen(screen, plan, project_name, values, compact)
+        return
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aia-screen") as pool:
+        futures = [pool.submit(render_screen, screen, plan, project_name, values, compact)
+                   for screen, plan in zip(screens, plans)]
+        for future in futures:
+            yield future.result()
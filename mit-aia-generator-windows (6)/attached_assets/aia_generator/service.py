@@ -0,0 +1,357 @@
+"""Long-running local HTTP service around the generator core.
+
+    python -m aia_generator serve --port 8765 --data-dir service-data
+
+Endpoints:
+
+    POST /extensions?name=Foo.aix   body: the .aix bytes -> {"digest", "name", "size"}
+    POST /build                     body: a JSON build spec -> the .aia bytes
+    GET  /metrics                   Prometheus text: build phases, queue and responses
+    GET  /healthz                   {"status": "ok", ...}
+
+A build spec has the create_aia_file inputs (project_name, search_prompt,
+requirements, screens, and user_id/api_key/cse_id or a config "profile"),
+"extensions" as a list of digests from POST /extensions, and optionally
+"compact", "timestamp" (Unix seconds) and "timeout" (seconds); the
+response's X-Content-SHA256 header holds the digest of the archive.  Uploaded
+extensions are kept under data_dir by SHA-256, so a client uploads each
+one once and refers to it by hash afterwards.
+
+Builds wait in a bounded queue served by a thread (or process) pool.  When
+the queue is full a request gets 429 with Retry-After instead of piling up,
+and a build that does not finish within its timeout gets 504 (a build
+already running still completes on its worker; its result is dropped).
+Only the standard library is used; responses close the connection.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, quote, urlsplit
+
+from .batch import _worker_extension_store
+from .compression import DEFAULT_POLICY
+from .config import get_store
+from .core import stream_aia
+from .errors import AIAGeneratorError, ConfigError, ExtensionNotFoundError, InputValidationError
+from .instrument import BuildStats, PhaseMetrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BODY = 256 * 1024 * 1024
+BUILD_FIELDS = ("project_name", "user_id", "api_key", "cse_id", "profile", "search_prompt", "requirements", "screens",
+                "extensions", "compact", "timestamp", "timeout")
+_FIELD_TYPES = {"project_name": (str,), "user_id": (str,), "api_key": (str,), "cse_id": (str,), "profile": (str,),
+                "search_prompt": (str,), "requirements": (str,), "screens": (list,), "extensions": (list,),
+                "compact": (bool,), "timestamp": (int, float), "timeout": (int, float)}
+_EXTENSION_NAME_RE = re.compile(r"[A-Za-z0-9_.-]+\.aix\Z")
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 408: "Request Timeout",
+            413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error",
+            503: "Service Unavailable", 504: "Gateway Timeout"}
+
+def _content_disposition(filename):
+    """Content-Disposition of an attachment: an ASCII fallback name plus the UTF-8 one (RFC 6266 / 5987)."""
+    fallback = "".join(c if " " <= c < "\x7f" and c not in '"\\' else "_" for c in filename)
+    return f'attachment; filename="{fallback}"; filename*=UTF-8\'\'{quote(filename, safe="")}'
+
+def _response_bytes(status, headers, body):
+    headers.setdefault("Content-Type", "application/json")
+    head = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}", f"Content-Length: {len(body)}",
+            "Connection: close"] + [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+class _HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+def _run_build(spec, extension_paths, extension_store_dir, compression):
+    """Build one spec into bytes; runs on the worker pool (module level so processes can pickle it)."""
+    stats = BuildStats(spec["project_name"])
+    timestamp = spec.get("timestamp")
+    out = io.BytesIO()
+    stream_aia(spec["project_name"], spec.get("user_id", ""), spec.get("api_key", ""), spec.get("cse_id", ""),
+               spec.get("search_prompt", ""), spec.get("requirements", ""), extension_paths, out,
+               datetime.fromtimestamp(timestamp, timezone.utc) if timestamp is not None else None,
+               bool(spec.get("compact")), _worker_extension_store(extension_store_dir), compression, stats,
+               spec.get("screens"))
+    return out.getvalue(), stats.digest, stats.phases, stats.counters, stats.screens
+
+class GeneratorService:
+    """The HTTP server, its bounded build queue and its worker pool."""
+
+    def __init__(self, data_dir, host="127.0.0.1", port=DEFAULT_PORT, workers=None, use_processes=False,
+                 queue_size=16, timeout=30.0, max_body=DEFAULT_MAX_BODY, extension_store_dir=None,
+                 compression=DEFAULT_POLICY, config_store=None):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.max_body = max_body
+        self.extension_store_dir = extension_store_dir
+        self.compression = compression
+        self.config_store = config_store or get_store()
+        self.extensions_dir = os.path.join(data_dir, "extensions")
+        self.metrics = PhaseMetrics()
+        self._extensions = {}
+        self._responses = {}
+        self._busy = 0
+        self._queue = None
+        self._server = None
+        self._executor = None
+        self._worker_tasks = []
+        os.makedirs(self.extensions_dir, exist_ok=True)
+        self._load_extensions()
+
+    def _load_extensions(self):
+        for digest in os.listdir(self.extensions_dir):
+            directory = os.path.join(self.extensions_dir, digest)
+            names = os.listdir(directory) if os.path.isdir(directory) else []
+            if len(names) == 1 and _EXTENSION_NAME_RE.match(names[0]):
+                self._extensions[digest] = os.path.join(directory, names[0])
+        logger.debug("Loaded %d uploaded extensions from %s", len(self._extensions), self.extensions_dir)
+
+    async def start(self):
+        """Start listening and return the bound (host, port); port=0 picks a free port."""
+        executor_cls = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        self._executor = executor_cls(max_workers=self.workers)
+        self._queue = asyncio.Queue(self.queue_size)
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        logger.info("Serving on http://%s:%d with %d %s workers", self.host, self.port, self.workers,
+                    "process" if self.use_processes else "thread")
+        return self.host, self.port
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            spec, extension_paths, future = await self._queue.get()
+            try:
+                if future.done():  # timed out while still queued
+                    continue
+                self._busy += 1
+                try:
+                    result = await loop.run_in_executor(self._executor, _run_build, spec, extension_paths,
+                                                        self.extension_store_dir, self.compression)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+                finally:
+                    self._busy -= 1
+            finally:
+                self._queue.task_done()
+
+    async def _handle(self, reader, writer):
+        # The response is encoded inside the try, so a header that cannot be sent still ends as a 500
+        try:
+            method, target, request_headers, request_body = await asyncio.wait_for(
+                self._read_request(reader), self.timeout)
+            status, headers, body = await self._dispatch(method, target, request_headers, request_body)
+            response = _response_bytes(status, headers, body)
+        except _HTTPError as e:
+            status, response = e.status, _response_bytes(e.status, e.headers, self._json({"error": str(e)}))
+        except asyncio.TimeoutError:
+            status, response = 408, _response_bytes(408, {}, self._json({"error": "request not received in time"}))
+        except Exception as e:
+            logger.exception("Unhandled error serving request")
+            status, response = 500, _response_bytes(500, {}, self._json({"error": f"{type(e).__name__}: {str(e)}"}))
+        self._responses[status] = self._responses.get(status, 0) + 1
+        try:
+            writer.write(response)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").strip()
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise _HTTPError(400, "malformed request line") from None
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise _HTTPError(400, "invalid Content-Length") from None
+        if length > self.max_body:
+            raise _HTTPError(413, f"request body is larger than {self.max_body} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    async def _dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        routes = {
+            "/build": ("POST", self._build),
+            "/extensions": ("POST", self._upload_extension),
+            "/metrics": ("GET", self._metrics),
+            "/healthz": ("GET", self._health),
+        }
+        if url.path not in routes:
+            raise _HTTPError(404, f"no such endpoint {url.path}")
+        allowed, handler = routes[url.path]
+        if method != allowed:
+            raise _HTTPError(405, f"{url.path} only accepts {allowed}", {"Allow": allowed})
+        return await handler(parse_qs(url.query), body)
+
+    @staticmethod
+    def _json(value):
+        return json.dumps(value).encode("utf-8")
+
+    async def _upload_extension(self, query, body):
+        name = os.path.basename(query.get("name", [""])[0])
+        if not _EXTENSION_NAME_RE.match(name):
+            raise _HTTPError(400, "pass the extension file name as ?name=Something.aix")
+        if not body:
+            raise _HTTPError(400, "empty extension upload")
+        loop = asyncio.get_running_loop()
+        digest, _ = await loop.run_in_executor(None, self._store_extension, name, body)
+        return 200, {}, self._json({"digest": digest, "name": name, "size": len(body)})
+
+    def _store_extension(self, name, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._extensions.get(digest)
+        if path is None:
+            directory = os.path.join(self.extensions_dir, digest)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, name)
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.extensions_dir)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._extensions[digest] = path
+            logger.info("Stored uploaded extension %s as %s", name, digest)
+        return digest, path
+
+    def _resolve_spec(self, body):
+        try:
+            spec = json.loads(body or b"{}")
+        except ValueError as e:
+            raise _HTTPError(400, f"invalid JSON: {str(e)}") from e
+        if not isinstance(spec, dict) or not spec.get("project_name"):
+            raise _HTTPError(400, "the build spec must be a JSON object with a project_name")
+        unknown = set(spec) - set(BUILD_FIELDS)
+        if unknown:
+            raise _HTTPError(400, f"unknown field(s) {', '.join(sorted(unknown))}")
+        # null means the field was left out
+        spec = {key: value for key, value in spec.items() if value is not None}
+        for key, value in spec.items():
+            types = _FIELD_TYPES[key]
+            # bool is an int, but true is not a timestamp
+            if not isinstance(value, types) or isinstance(value, bool) and bool not in types:
+                raise _HTTPError(400, f"{key} must be {' or '.join(t.__name__ for t in types)}, "
+                                      f"not {type(value).__name__}")
+        if spec.get("timeout", 1) <= 0:
+            raise _HTTPError(400, "timeout must be positive")
+        if "timestamp" in spec:
+            try:
+                datetime.fromtimestamp(spec["timestamp"], timezone.utc)
+            except (OverflowError, OSError, ValueError) as e:
+                raise _HTTPError(400, f"timestamp out of range: {str(e)}") from e
+        try:
+            credentials = self.config_store.profile(spec.pop("profile", None))
+        except ConfigError as e:
+            raise _HTTPError(400, str(e)) from e
+        for key, value in credentials.items():
+            spec.setdefault(key, value)
+        extension_paths = []
+        for digest in spec.pop("extensions", None) or []:
+            if not isinstance(digest, str) or digest not in self._extensions:
+                raise _HTTPError(400, f"unknown extension {digest!r}; upload it to /extensions first")
+            extension_paths.append(self._extensions[digest])
+        return spec, extension_paths
+
+    async def _build(self, query, body):
+        spec, extension_paths = self._resolve_spec(body)
+        timeout = spec.pop("timeout", None) or self.timeout
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((spec, extension_paths, future))
+        except asyncio.QueueFull:
+            raise _HTTPError(429, "build queue is full", {"Retry-After": "1"}) from None
+        start = time.perf_counter()
+        try:
+            data, digest, phases, counters, screens = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise _HTTPError(504, f"build did not finish within {timeout} s") from None
+        except (InputValidationError, ExtensionNotFoundError, ConfigError) as e:
+            raise _HTTPError(400, str(e)) from e
+        except (AIAGeneratorError, OSError) as e:
+            raise _HTTPError(500, str(e)) from e
+        stats = BuildStats.from_phases(spec["project_name"], phases, counters, screens)
+        self.metrics.observe(stats)
+        return 200, {
+            "Content-Type": "application/zip",
+            "Content-Disposition": _content_disposition(f"{spec['project_name']}.aia"),
+            "X-Content-SHA256": digest,
+            "X-Build-Ms": f"{stats.total * 1000:.1f}",
+            "X-Request-Ms": f"{(time.perf_counter() - start) * 1000:.1f}",
+        }, data
+
+    async def _metrics(self, query, body):
+        prefix = "aia_service"
+        lines = [self.metrics.prometheus_text().rstrip("\n"),
+                 f"# TYPE {prefix}_queue_depth gauge", f"{prefix}_queue_depth {self._queue.qsize()}",
+                 f"# TYPE {prefix}_queue_capacity gauge", f"{prefix}_queue_capacity {self.queue_size}",
+                 f"# TYPE {prefix}_busy_workers gauge", f"{prefix}_busy_workers {self._busy}",
+                 f"# TYPE {prefix}_uploaded_extensions gauge", f"{prefix}_uploaded_extensions {len(self._extensions)}",
+                 f"# TYPE {prefix}_http_responses_total counter"]
+        lines += [f'{prefix}_http_responses_total{{status="{status}"}} {count}'
+                  for status, count in sorted(self._responses.items())]
+        return 200, {"Content-Type": "text/plain; version=0.0.4"}, ("\n".join(lines) + "\n").encode("utf-8")
+
+    async def _health(self, query, body):
+        return 200, {}, self._json({"status": "ok", "queue_depth": self._queue.qsize(), "busy_workers": self._busy,
+                                    "workers": self.workers})
+
+def serve(data_dir, **options):
+    """Run a GeneratorService until interrupted."""
+    service = GeneratorService(data_dir, **options)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
@@ -0,0 +1,448 @@
+"""Pre-compiled templates for project.properties and each screen's .scm and .bky.
+
+Every fragment is split once, at import time, into constant chunks and
+@@slot@@ markers, in both an indented and a compact form.  Rendering a build
+only escapes the slot values (api_key, cse_id, project_name, search_prompt,
+...) and joins the chunks; the static JSON and XML is never re-serialized.
+New blocks and components are added with BLOCKS.register_block and
+COMPONENTS.register_component.  Component Uuids and block positions are
+the @@uuid@@, @@x@@ and @@y@@ slots; the plugin registry fills them in.
+"""
+
+import json
+import re
+from xml.sax.saxutils import escape as xml_escape
+
+from .errors import BuildError
+
+_SLOT_RE = re.compile(r"@@(\w+)@@")
+# In JSON fragments a slot is a whole string literal, quotes included
+_JSON_SLOT_RE = re.compile(r'"@@(\w+)@@"')
+_SCM_COMPONENT_INDENT = " " * 6
+DEFAULT_BLOCK_HEIGHT = 300
+
+def _raw(value):
+    return str(value)
+
+def _json_string(value):
+    return json.dumps(value)
+
+def _compact_xml(text):
+    return re.sub(r"\s+<", "<", re.sub(r">\s+", ">", text.strip()))
+
+class Template:
+    """Text compiled once into constant chunks and named slots."""
+
+    __slots__ = ("name", "slots", "_parts", "_escapes", "_static")
+
+    def __init__(self, name, text, escape=_raw, raw_slots=(), pattern=_SLOT_RE):
+        self.name = name
+        self._parts = pattern.split(text)
+        self.slots = tuple(self._parts[1::2])
+        self._escapes = tuple(_raw if slot in raw_slots else escape for slot in self.slots)
+        self._static = text if not self.slots else None
+
+    def render(self, **values):
+        if self._static is not None:
+            return self._static
+        parts = list(self._parts)
+        for i, (slot, escape) in enumerate(zip(self.slots, self._escapes)):
+            try:
+                parts[2 * i + 1] = escape(values[slot])
+            except KeyError:
+                raise BuildError(f"Template {self.name} is missing a value for {slot}") from None
+        return "".join(parts)
+
+    def bind(self, **values):
+        """Return a Template with the given slots filled in and the others left open."""
+        parts, slots, escapes = [self._parts[0]], [], []
+        for i, (slot, escape) in enumerate(zip(self.slots, self._escapes)):
+            tail = self._parts[2 * i + 2]
+            if slot in values:
+                parts[-1] += escape(values[slot]) + tail
+            else:
+                parts += [slot, tail]
+                slots.append(slot)
+                escapes.append(escape)
+        bound = Template.__new__(Template)
+        bound.name = self.name
+        bound._parts = parts
+        bound.slots = tuple(slots)
+        bound._escapes = tuple(escapes)
+        bound._static = parts[0] if not slots else None
+        return bound
+
+class TemplateRegistry:
+    """Named fragments, each compiled in an indented and a compact form."""
+
+    def __init__(self, escape, pattern=_SLOT_RE):
+        self.escape = escape
+        self.pattern = pattern
+        self._templates = {}
+
+    def register(self, name, text, compact_text, raw_slots=()):
+        self._templates[name] = (
+            Template(name, text, self.escape, raw_slots, self.pattern),
+            Template(name, compact_text, self.escape, raw_slots, self.pattern),
+        )
+
+    def get(self, name, compact=False):
+        try:
+            return self._templates[name][compact]
+        except KeyError:
+            raise BuildError(f"Unknown template {name}") from None
+
+    def render(self, name, compact=False, **values):
+        return self.get(name, compact).render(**values)
+
+    def __contains__(self, name):
+        return name in self._templates
+
+    def names(self):
+        return list(self._templates)
+
+class BlockRegistry(TemplateRegistry):
+    """Blockly XML fragments for screen .bky files; slot values are XML-escaped."""
+
+    def __init__(self):
+        super().__init__(xml_escape)
+        self._heights = {}
+
+    def register_block(self, name, xml, height=DEFAULT_BLOCK_HEIGHT):
+        """Register a top-level block; height is the workspace space it takes up, for layout."""
+        self.register(name, xml, _compact_xml(xml))
+        self._heights[name] = height
+
+    def height(self, name):
+        return self._heights.get(name, DEFAULT_BLOCK_HEIGHT)
+
+class ComponentRegistry(TemplateRegistry):
+    """Designer component dicts for screen .scm files; slot values are JSON strings."""
+
+    def __init__(self):
+        super().__init__(_json_string, _JSON_SLOT_RE)
+
+    def register_component(self, properties):
+        """Register a component dict under its $Name; use "@@slot@@" for variable values."""
+        pretty = json.dumps(properties, indent=2).replace("\n", "\n" + _SCM_COMPONENT_INDENT)
+        self.register(properties["$Name"], pretty, json.dumps(properties, separators=(",", ":")))
+
+BLOCKS = BlockRegistry()
+COMPONENTS = ComponentRegistry()
+
+PROJECT_PROPERTIES = Template("project.properties", """#
+#@@timestamp@@
+sizing=Responsive
+color.primary.dark=&HFF303F9F
+color.primary=&HFF3F51B5
+color.accent=&HFFFF4081
+aname=@@project_name@@
+defaultfilescope=App
+main=appinventor.ai_@@user_id@@.@@project_name@@.@@main_screen@@
+source=../src
+actionbar=True
+useslocation=False
+assets=../assets
+build=../build
+name=@@project_name@@
+showlistsasjson=True
+theme=AppTheme.Light.DarkActionBar
+versioncode=1
+versionname=1.0
+external_comps=@@external_comps@@
+""")
+
+_SCREEN_SCM = {
+    "authURL": ["ai2.appinventor.mit.edu"],
+    "YaVersion": "232",
+    "Source": "Form",
+    "Properties": {
+        "$Name": "@@screen_name@@",
+        "$Type": "Form",
+        "$Version": "31",
+        "ActionBar": True,
+        "AppName": "@@project_name@@",
+        "Title": "@@title@@",
+        "Uuid": "0",
+        "$Components": ["@@components@@"]
+    }
+}
+_SCREEN_SCM_TEMPLATES = (
+    Template("screen.scm", f"#|\n$JSON\n{json.dumps(_SCREEN_SCM, indent=2)}\n|#",
+             _json_string, ("components",), _JSON_SLOT_RE),
+    Template("screen.scm", f"#|\n$JSON\n{json.dumps(_SCREEN_SCM, separators=(',', ':'))}\n|#",
+             _json_string, ("components",), _JSON_SLOT_RE),
+)
+
+_SCREEN_BKY = """<xml xmlns="http://www.w3.org/1999/xhtml">
+  <yacodeblocks ya-version="232" language-version="31">
+    @@blocks@@
+  </yacodeblocks>
+</xml>"""
+_SCREEN_BKY_TEMPLATES = (
+    Template("screen.bky", _SCREEN_BKY, raw_slots=("blocks",)),
+    Template("screen.bky", _compact_xml(_SCREEN_BKY), raw_slots=("blocks",)),
+)
+
+def render_scm(components, project_name, compact=False, screen_name="Screen1", title=None):
+    """Wrap rendered component fragments in a screen's Form (Screen1 by default)."""
+    separator = "," if compact else ",\n" + _SCM_COMPONENT_INDENT
+    return _SCREEN_SCM_TEMPLATES[compact].render(
+        components=separator.join(components), project_name=project_name, screen_name=screen_name,
+        title=title or f"{project_name} Search")
+
+def render_bky(blocks, compact=False):
+    """Wrap rendered block fragments in the Blockly workspace XML."""
+    return _SCREEN_BKY_TEMPLATES[compact].render(blocks="".join(blocks))
+
+COMPONENTS.register_component({
+    "$Name": "SearchBox",
+    "$Type": "TextBox",
+    "$Version": "6",
+    "Hint": "Enter search query",
+    "Text": "@@search_prompt@@",
+    "Width": "Fill",
+    "Uuid": "@@uuid@@"
+})
+COMPONENTS.register_component({
+    "$Name": "SearchButton",
+    "$Type": "Button",
+    "$Version": "7",
+    "Text": "Search",
+    "BackgroundColor": "&HFF4CAF50",
+    "TextColor": "&HFFFFFFFF",
+    "Width": "Fill",
+    "Uuid": "@@uuid@@"
+})
+COMPONENTS.register_component({
+    "$Name": "Web1",
+    "$Type": "Web",
+    "$Version": "6",
+    "Uuid": "@@uuid@@"
+})
+COMPONENTS.register_component({
+    "$Name": "ResultListView",
+    "$Type": "ListView",
+    "$Version": "8",
+    "Width": "Fill",
+    "Height": "WrapContent",
+    "Uuid": "@@uuid@@"
+})
+COMPONENTS.register_component({
+    "$Name": "ResultLabel",
+    "$Type": "Label",
+    "$Version": "6",
+    "Text": "Search results will appear here",
+    "FontSize": "16sp",
+    "TextAlignment": "center",
+    "Width": "Fill",
+    "Height": "WrapContent",
+    "Uuid": "@@uuid@@"
+})
+COMPONENTS.register_component({
+    "$Name": "SoundButton",
+    "$Type": "Button",
+    "$Version": "7",
+    "Text": "Play Sound",
+    "BackgroundColor": "&HFFF44336",
+    "TextColor": "&HFFFFFFFF",
+    "Width": "Fill",
+    "Uuid": "@@uuid@@"
+})
+COMPONENTS.register_component({
+    "$Name": "Sound1",
+    "$Type": "Sound",
+    "$Version": "6",
+    "Source": "sample_sound.mp3",
+    "Uuid": "@@uuid@@"
+})
+
+BLOCKS.register_block("search_click", """<block type="component_event" x="@@x@@" y="@@y@@">
+      <mutation component_type="Button" event_name="Click" component_id="SearchButton"></mutation>
+      <field name="component_id">SearchButton</field>
+      <field name="event_name">Click</field>
+      <statement name="DO">
+        <block type="component_method">
+          <mutation component_type="Web" method_name="Url" number_of_parameters="1"></mutation>
+          <field name="component_id">Web1</field>
+          <field name="method_name">Url</field>
+          <value name="arg0">
+            <block type="text_join">
+              <mutation items="4"></mutation>
+              <value name="ADD0">
+                <block type="text">
+                  <field name="TEXT">https://www.googleapis.com/customsearch/v1?key=</field>
+                </block>
+              </value>
+              <value name="ADD1">
+                <block type="text">
+                  <field name="TEXT">@@api_key@@</field>
+                </block>
+              </value>
+              <value name="ADD2">
+                <block type="text">
+                  <field name="TEXT">&amp;cx=@@cse_id@@&amp;q=</field>
+                </block>
+              </value>
+              <value name="ADD3">
+                <block type="component_get_property">
+                  <mutation component_type="TextBox" property_name="Text"></mutation>
+                  <field name="component_id">SearchBox</field>
+                  <field name="property_name">Text</field>
+                </block>
+              </value>
+            </block>
+          </value>
+          <next>
+            <block type="component_method">
+              <mutation component_type="Web" method_name="Get"></mutation>
+              <field name="component_id">Web1</field>
+              <field name="method_name">Get</field>
+            </block>
+          </next>
+        </block>
+      </statement>
+    </block>""", height=250)
+
+BLOCKS.register_block("got_text_list_view", """<block type="component_event" x="@@x@@" y="@@y@@">
+      <mutation component_type="Web" event_name="GotText" component_id="Web1"></mutation>
+      <field name="component_id">Web1</field>
+      <field name="event_name">GotText</field>
+      <statement name="DO">
+        <block type="controls_if">
+          <value name="IF0">
+            <block type="logic_compare">
+              <field name="OP">EQ</field>
+              <value name="A">
+                <block type="variable_get">
+                  <field name="VAR">responseCode</field>
+                </block>
+              </value>
+              <value name="B">
+                <block type="math_number">
+                  <field name="NUM">200</field>
+                </block>
+              </value>
+            </block>
+          </value>
+          <statement name="DO0">
+            <block type="component_set_get_property">
+              <mutation component_type="ListView" property_name="Elements"></mutation>
+              <field name="component_id">ResultListView</field>
+              <field name="property_name">Elements</field>
+              <value name="VALUE">
+                <block type="lists_create_with">
+                  <mutation items="0"></mutation>
+                  <value name="ADD0">
+                    <block type="controls_forEach">
+                      <field name="VAR">item</field>
+                      <value name="LIST">
+                        <block type="text_get_property">
+                          <mutation property_name="items"></mutation>
+                          <value name="DICTIONARY">
+                            <block type="text_json_to_dictionary">
+                              <value name="TEXT">
+                                <block type="variable_get">
+                                  <field name="VAR">responseContent</field>
+                                </block>
+                              </value>
+                            </block>
+                          </value>
+                          <field name="PROP">items</field>
+                        </block>
+                      </value>
+                      <statement name="DO">
+                        <block type="lists_create_with">
+                          <mutation items="1"></mutation>
+                          <value name="ADD0">
+                            <block type="text_get_property">
+                              <mutation property_name="title"></mutation>
+                              <value name="DICTIONARY">
+                                <block type="variable_get">
+                                  <field name="VAR">item</field>
+                                </block>
+                              </value>
+                              <field name="PROP">title</field>
+                            </block>
+                          </value>
+                        </block>
+                      </statement>
+                    </block>
+                  </value>
+                </block>
+              </value>
+            </block>
+          </statement>
+        </block>
+      </statement>
+    </block>""")
+
+BLOCKS.register_block("got_text_label", """<block type="component_event" x="@@x@@" y="@@y@@">
+      <mutation component_type="Web" event_name="GotText" component_id="Web1"></mutation>
+      <field name="component_id">Web1</field>
+      <field name="event_name">GotText</field>
+      <statement name="DO">
+        <block type="controls_if">
+          <value name="IF0">
+            <block type="logic_compare">
+              <field name="OP">EQ</field>
+              <value name="A">
+                <block type="variable_get">
+                  <field name="VAR">responseCode</field>
+                </block>
+              </value>
+              <value name="B">
+                <block type="math_number">
+                  <field name="NUM">200</field>
+                </block>
+              </value>
+            </block>
+          </value>
+          <statement name="DO0">
+            <block type="component_set_get_property">
+              <mutation component_type="Label" property_name="Text"></mutation>
+              <field name="component_id">ResultLabel</field>
+              <field name="property_name">Text</field>
+              <value name="VALUE">
+                <block type="text_join">
+                  <mutation items="2"></mutation>
+                  <value name="ADD0">
+                    <block type="text_get_property">
+                      <mutation property_name="title"></mutation>
+                      <value name="DICTIONARY">
+                        <block type="text_json_to_dictionary">
+                          <value name="TEXT">
+                            <block type="variable_get">
+                              <field name="VAR">responseContent</field>
+                            </block>
+                          </value>
+                        </block>
+                      </value>
+                      <field name="PROP">title</field>
+                    </block>
+                  </value>
+                  <value name="ADD1">
+                    <block type="text">
+                      <field name="TEXT"></field>
+                    </block>
+                  </value>
+                </block>
+              </value>
+            </block>
+          </statement>
+        </block>
+      </statement>
+    </block>""")
+
+BLOCKS.register_block("sound_click", """<block type="component_event" x="@@x@@" y="@@y@@">
+      <mutation component_type="Button" event_name="Click" component_id="SoundButton"></mutation>
+      <field name="component_id">SoundButton</field>
+      <field name="event_name">Click</field>
+      <statement name="DO">
+        <block type="component_method">
+          <mutation component_type="Sound" method_name="Play"></mutation>
+          <field name="component_id">Sound1</field>
+          <field name="method_name">Play</field>
+        </block>
+      </statement>
+    </block>""")
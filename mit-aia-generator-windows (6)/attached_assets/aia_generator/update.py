@@ -0,0 +1,198 @@
+"""Incremental re-generation of an existing .aia.
+
+update_aia renders the project from new inputs exactly like build_aia, but
+every member whose bytes would not change is lifted from the existing
+archive in raw compressed form (ziputil.write_raw_member): it is never
+inflated or deflated again.  Only the entries that really changed, usually
+a screen's .scm/.bky or project.properties, are compressed.  Members the
+generator does not produce (a Screen2 or an icon added in App Inventor)
+are carried over; only its own files that the new inputs no longer call
+for, such as a plugin asset of a feature turned off, are dropped.  Deflated
+members are only reused when the archive comment shows they were deflated
+at the requested level (see compression.py), so the result holds the same
+entries as a full build from the same inputs.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+import zlib
+
+from .compression import DEFAULT_POLICY, deflate_level_of
+from .core import (BuildResult, _HashingFile, _extension_names, _extension_packages, _validate_save_path,
+                   _write_extension, _zip_entry, iter_project_entries, parse_requirements, source_date_epoch, validate_inputs)
+from .errors import AIAGeneratorError, BuildError
+from .instrument import BuildStats
+from .plugins import PLUGINS
+from .screens import normalize_screens
+from .validate import parse_properties
+from .ziputil import COPY_CHUNK_SIZE, raw_data_offset, write_raw_member
+
+logger = logging.getLogger(__name__)
+
+_PROPERTIES = "youngandroidproject/project.properties"
+_EXTENSIONS_DIR = "assets/external_comps/"
+
+def _file_crc(path):
+    crc = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+def _copy_member(zf, raw, previous, zinfo):
+    """Write zinfo with previous's compressed bytes, read raw from the source archive file."""
+    zinfo.CRC = previous.CRC
+    zinfo.file_size = previous.file_size
+    zinfo.compress_size = previous.compress_size
+    raw.seek(raw_data_offset(raw, previous))
+    write_raw_member(zf, zinfo, raw)
+
+def _find_root(names, source_path):
+    """The folder holding the project in the source archive, found through its project.properties."""
+    for name in names:
+        if name == _PROPERTIES or name.endswith("/" + _PROPERTIES):
+            return name[:-len(_PROPERTIES)]
+    raise BuildError(f"{source_path} has no {_PROPERTIES}; is it an .aia?")
+
+def update_aia(source_path, project_name, user_id, api_key, cse_id, search_prompt, requirements, extensions=None,
+               save_path=None, timestamp=None, compact=False, extension_store=None, compression=DEFAULT_POLICY,
+               screens=None):
+    """Rebuild the .aia at source_path for new inputs, reusing unchanged members; return a BuildResult.
+
+    The archive is written to save_path (default: source_path, replaced
+    atomically).  A member is copied when its path, CRC, size and
+    compression type match the freshly rendered entry.  extensions=None
+    keeps the archive's bundled extensions, and their external_comps,
+    without reading them; with a list, an extension is copied when its size
+    and CRC match (the CRC comes from extension_store when given, otherwise
+    from one read of the file).
+    Every other member of the source project is kept, moved under
+    project_name, unless it is a generator file the new inputs no longer
+    produce.  Other options are as for build_aia.  stats counts
+    copied_entries and rewritten_entries.
+    """
+    stats = BuildStats(project_name)
+    with stats.phase("validation"):
+        validate_inputs(project_name, user_id, api_key, cse_id, search_prompt)
+        save_path = _validate_save_path(save_path or source_path)
+        timestamp = timestamp or source_date_epoch()
+        screens = normalize_screens(screens) if screens else None
+    with stats.phase("parse_requirements"):
+        features = parse_requirements(requirements)
+    ext_prefix = f"{project_name}/assets/external_comps/"
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".aia-update-", suffix=".tmp", dir=os.path.dirname(save_path) or None)
+    os.close(fd)
+    try:
+        with stats.phase("read_source"):
+            old_zip = zipfile.ZipFile(source_path)
+            previous = {info.filename: info for info in old_zip.infolist()}
+            old_root = _find_root(previous, source_path)
+            old_level = deflate_level_of(old_zip.comment)
+
+        def reusable(old, zinfo):
+            """Whether old's compressed bytes are what compressing zinfo's data would give."""
+            return old.compress_type == zinfo.compress_type and (
+                zinfo.compress_type == zipfile.ZIP_STORED or old_level == compression.deflate_level)
+
+        def carry(name):
+            """Write the source member name under project_name, raw-copied when its compression fits."""
+            zinfo = _zip_entry(f"{project_name}/{name[len(old_root):]}", timestamp, compression)
+            if reusable(previous[name], zinfo):
+                _copy_member(zf, raw, previous[name], zinfo)
+                stats.count("copied_entries")
+            else:
+                zinfo.file_size = previous[name].file_size
+                with old_zip.open(name) as src, zf.open(zinfo, "w") as dst:
+                    shutil.copyfileobj(src, dst)
+                stats.count("rewritten_entries")
+
+        with old_zip, open(source_path, "rb") as raw, _HashingFile(open(tmp_path, "wb")) as writer, \
+                zipfile.ZipFile(writer, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.comment = compression.archive_comment()
+            with stats.phase("validation"):
+                if extensions is None:
+                    # Kept extensions move under project_name if the project was renamed
+                    kept = [name for name in previous
+                            if name.startswith(old_root + _EXTENSIONS_DIR) and not name.endswith("/")]
+                    extension_names = [os.path.splitext(name[len(old_root + _EXTENSIONS_DIR):])[0] for name in kept]
+                    external_comps = parse_properties(old_zip.read(old_root + _PROPERTIES).decode("utf-8")).get(
+                        "external_comps", "")
+                    packages = [package for package in external_comps.split(",") if package]
+                else:
+                    extension_names = _extension_names(extensions)
+                    packages = _extension_packages(extensions)
+
+            entries = iter_project_entries(project_name, user_id, api_key, cse_id, search_prompt, features,
+                                           extension_names, timestamp, compact, screens, stats=stats,
+                                           extension_packages=packages)
+            rendered = set()
+            while True:
+                with stats.phase("render"):
+                    entry = next(entries, None)
+                if entry is None:
+                    break
+                relpath, data = entry
+                rendered.add(relpath)
+                zinfo = _zip_entry(f"{project_name}/{relpath}", timestamp, compression)
+                old = previous.get(zinfo.filename)
+                if (old is not None and reusable(old, zinfo) and old.file_size == len(data)
+                        and old.CRC == zlib.crc32(data)):
+                    with stats.phase("copy"):
+                        _copy_member(zf, raw, old, zinfo)
+                    stats.count("copied_entries")
+                else:
+                    with stats.phase("zip"):
+                        zf.writestr(zinfo, data)
+                    stats.count("rewritten_entries")
+
+            with stats.phase("extensions"):
+                if extensions is None:
+                    for name in kept:
+                        carry(name)
+                else:
+                    for ext_path in extensions:
+                        zinfo = _zip_entry(f"{ext_prefix}{os.path.basename(ext_path)}", timestamp, compression)
+                        old = previous.get(zinfo.filename)
+                        if (old is not None and reusable(old, zinfo)
+                                and old.file_size == os.path.getsize(ext_path)
+                                and old.CRC == (extension_store.add(ext_path, compress=False).crc if extension_store is not None
+                                                else _file_crc(ext_path))):
+                            _copy_member(zf, raw, old, zinfo)
+                            stats.count("copied_entries")
+                        else:
+                            _write_extension(zf, zinfo, ext_path, extension_store)
+                            stats.count("rewritten_entries")
+
+            with stats.phase("copy"):
+                # Screens keep their file names when a rename moves their package folder
+                screen_files = {relpath.rpartition("/")[2] for relpath in rendered if relpath.startswith("src/")}
+                owned = PLUGINS.asset_paths() | {_PROPERTIES}
+                for name in previous:
+                    relpath = name[len(old_root):]
+                    if (not name.startswith(old_root) or name.endswith("/") or relpath in rendered or relpath in owned
+                            or relpath.startswith(_EXTENSIONS_DIR)
+                            or relpath.startswith("src/") and relpath.rpartition("/")[2] in screen_files):
+                        continue
+                    carry(name)
+                    logger.debug("Kept %s from %s", relpath, source_path)
+
+        with stats.phase("verify"):
+            size = os.path.getsize(tmp_path)
+            if size == 0:
+                raise BuildError(f"Updated .aia file is empty: {save_path}")
+        stats.digest = writer.hexdigest()
+        os.replace(tmp_path, save_path)
+    except AIAGeneratorError:
+        raise
+    except (OSError, zipfile.BadZipFile) as e:
+        raise BuildError(f"Failed to update {source_path}: {str(e)}") from e
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    logger.info("Updated %s: %d entries copied, %d rewritten in %.1f ms", save_path,
+                stats.counters.get("copied_entries", 0), stats.counters.get("rewritten_entries", 0), stats.total * 1000)
+    return BuildResult(save_path, size, stats=stats, digest=stats.digest)
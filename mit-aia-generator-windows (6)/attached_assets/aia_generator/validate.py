@@ -0,0 +1,239 @@
+"""Structural validation of .aia archives, one at a time or in bulk.
+
+validate_aia memory-maps an archive and checks it in place, without
+extracting anything to disk:
+
+* project.properties is present and names an existing main screen;
+* every .scm holds parseable $JSON for a Form of the same name;
+* every .bky is well-formed XML, and each component it references exists
+  in its screen's .scm;
+* asset files referenced by components (Sound Source, ...) exist;
+* external_comps lists exactly the component types of the extensions
+  under assets/external_comps, read from each .aix's metadata.
+
+iter_validate runs it over many archives on a process pool, keeping a
+bounded number of archives in flight, and yields each ValidationReport as
+soon as it is ready.
+"""
+
+import json
+import mmap
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from xml.etree import ElementTree
+
+from .errors import ExtensionError
+from .extinfo import read_packages
+
+_PROPERTIES = "youngandroidproject/project.properties"
+_EXTENSIONS_DIR = "assets/external_comps/"
+_ASSET_PROPERTIES = ("Source", "Image", "BackgroundImage", "Picture", "Icon")
+
+class _MappedFile:
+    """A read-only mmap as a file object zipfile accepts (mmap gained seekable() only in 3.13)."""
+
+    def __init__(self, mapped):
+        self._mapped = mapped
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        try:
+            return self._mapped.seek(offset, whence)
+        except ValueError as e:  # files raise OSError, which zipfile expects
+            raise OSError(str(e)) from e
+
+    def __getattr__(self, name):
+        return getattr(self._mapped, name)
+
+@dataclass
+class ValidationReport:
+    """Outcome of validating one archive; ok when errors is empty."""
+    path: str
+    entries: int = 0
+    screens: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def ok(self):
+        return not self.errors
+
+def parse_properties(text):
+    properties = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#") and "=" in line:
+            key, value = line.split("=", 1)
+            properties[key.strip()] = value.strip()
+    return properties
+
+def parse_scm(text):
+    """Return the $JSON object of a .scm file."""
+    text = text.strip()
+    if not text.startswith("#|") or not text.endswith("|#"):
+        raise ValueError("missing #| ... |# wrapper")
+    body = text[2:-2].strip()
+    if not body.startswith("$JSON"):
+        raise ValueError("missing $JSON marker")
+    return json.loads(body[len("$JSON"):])
+
+def _walk_components(properties):
+    for component in properties.get("$Components", ()):
+        yield component
+        yield from _walk_components(component)
+
+def _block_component_ids(root):
+    for element in root.iter():
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag == "mutation" and element.get("component_id"):
+            yield element.get("component_id")
+        elif tag == "field" and element.get("name") == "component_id" and element.text:
+            yield element.text
+
+def _check_screen(zf, name, scm_path, bky_path, asset_names, errors):
+    try:
+        form = parse_scm(zf.read(scm_path).decode("utf-8"))["Properties"]
+    except (KeyError, ValueError, UnicodeDecodeError) as e:
+        errors.append(f"{scm_path}: invalid .scm: {str(e)}")
+        return
+    if form.get("$Type") != "Form" or form.get("$Name") != name:
+        errors.append(f"{scm_path}: expected Form {name}, found {form.get('$Type')} {form.get('$Name')}")
+    components = {form.get("$Name")}
+    uuids = {}
+    for component in _walk_components(form):
+        component_name = component.get("$Name")
+        if component_name in components:
+            errors.append(f"{scm_path}: duplicate component {component_name}")
+        components.add(component_name)
+        uuid = component.get("Uuid")
+        if uuid in uuids:
+            errors.append(f"{scm_path}: {component_name} and {uuids[uuid]} share Uuid {uuid}")
+        uuids[uuid] = component_name
+        for key in _ASSET_PROPERTIES:
+            asset = component.get(key)
+            if asset and f"assets/{asset}" not in asset_names:
+                errors.append(f"{scm_path}: {component_name}.{key} refers to missing asset {asset}")
+    if bky_path is None:
+        return
+    try:
+        root = ElementTree.fromstring(zf.read(bky_path))
+    except ElementTree.ParseError as e:
+        errors.append(f"{bky_path}: invalid XML: {str(e)}")
+        return
+    for component_id in sorted(set(_block_component_ids(root)) - components):
+        errors.append(f"{bky_path}: block references unknown component {component_id}")
+
+def _check_archive(zf, report):
+    errors = report.errors
+    names = zf.namelist()
+    report.entries = len(names)
+    properties_paths = [name for name in names if name.endswith("/" + _PROPERTIES) or name == _PROPERTIES]
+    if len(properties_paths) != 1:
+        errors.append(f"expected one {_PROPERTIES}, found {len(properties_paths)}")
+        return
+    root = properties_paths[0][:-len(_PROPERTIES)]
+    relative = {name[len(root):]: name for name in names if name.startswith(root)}
+    properties = parse_properties(zf.read(properties_paths[0]).decode("utf-8", "replace"))
+
+    sources = {}
+    for relpath in relative:
+        if relpath.startswith("src/") and relpath.endswith((".scm", ".bky")):
+            stem, suffix = os.path.splitext(relpath)
+            sources.setdefault(stem, {})[suffix] = relative[relpath]
+    for stem, files in sorted(sources.items()):
+        name = stem.rsplit("/", 1)[-1]
+        if ".scm" not in files:
+            errors.append(f"{files['.bky']}: no matching .scm")
+            continue
+        report.screens.append(name)
+        _check_screen(zf, name, files[".scm"], files.get(".bky"), relative, errors)
+
+    main = properties.get("main", "")
+    if not main:
+        errors.append(f"{_PROPERTIES}: no main screen")
+    elif main.rsplit(".", 1)[-1] not in report.screens:
+        errors.append(f"{_PROPERTIES}: main screen {main} has no .scm")
+
+    listed = {package for package in properties.get("external_comps", "").split(",") if package}
+    bundled = {}
+    for relpath in relative:
+        if relpath.startswith(_EXTENSIONS_DIR) and relpath != _EXTENSIONS_DIR:
+            entry = relpath[len(_EXTENSIONS_DIR):].split("/", 1)[0]
+            if not entry.lower().endswith(".aix"):
+                bundled.setdefault(entry, [entry])
+                continue
+            try:
+                with zf.open(relative[relpath]) as f:
+                    bundled[entry] = read_packages(f)
+            except ExtensionError as e:
+                errors.append(f"{_EXTENSIONS_DIR}{entry}: {str(e)}")
+                bundled[entry] = listed
+    provided = {package for packages in bundled.values() for package in packages}
+    for package in sorted(listed - provided):
+        errors.append(f"external_comps lists {package} but it is not under {_EXTENSIONS_DIR}")
+    for entry, packages in sorted(bundled.items()):
+        if not listed.intersection(packages):
+            errors.append(f"{_EXTENSIONS_DIR}{entry} is not listed in external_comps")
+
+def validate_aia(path, check_crc=False):
+    """Validate one archive through a read-only memory map; return a ValidationReport.
+
+    check_crc also inflates every member to verify its CRC, which reads
+    all of the archive's data, extensions included.
+    """
+    start = time.perf_counter()
+    report = ValidationReport(path)
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                report.errors.append("empty file")
+                return report
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, zipfile.ZipFile(_MappedFile(mapped)) as zf:
+                if check_crc:
+                    bad = zf.testzip()
+                    if bad is not None:
+                        report.errors.append(f"{bad}: CRC mismatch")
+                _check_archive(zf, report)
+    except Exception as e:
+        report.errors.append(f"{type(e).__name__}: {str(e)}")
+    finally:
+        report.duration = time.perf_counter() - start
+    return report
+
+def find_archives(paths):
+    """Yield the .aia files among paths, descending into directories."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(".aia"):
+                    yield os.path.join(root, name)
+
+def iter_validate(paths, workers=None, use_threads=False, check_crc=False, max_pending=None):
+    """Validate every archive in paths and yield ValidationReports as they complete.
+
+    At most max_pending archives (default 4 per worker) are queued at once,
+    so memory stays flat however many files the directory holds.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 4 * workers
+    executor_class = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        pending = set()
+        for path in find_archives(paths):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(executor.submit(validate_aia, path, check_crc))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
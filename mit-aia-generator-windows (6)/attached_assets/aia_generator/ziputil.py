@@ -0,0 +1,60 @@
+"""Low-level zip helpers the zipfile module has no public API for.
+
+write_raw_member appends a member whose compressed bytes, CRC and sizes are
+already known (a pre-deflated extension blob, or a member lifted from
+another archive with raw_data_offset) without decompressing or
+recompressing it.  It relies on the same ZipFile internals as
+ZipFile._open_to_write.
+"""
+
+import struct
+import zipfile
+
+COPY_CHUNK_SIZE = 1024 * 1024
+# General purpose flag bit 3; zipfile only names it from Python 3.11
+_MASK_USE_DATA_DESCRIPTOR = getattr(zipfile, "_MASK_USE_DATA_DESCRIPTOR", 0x08)
+
+def copy_bytes(src, dst, size, chunk_size=COPY_CHUNK_SIZE):
+    """Copy exactly size bytes from src to dst in bounded chunks."""
+    remaining = size
+    while remaining:
+        chunk = src.read(min(chunk_size, remaining))
+        if not chunk:
+            raise EOFError(f"Source ended {remaining} bytes early")
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+def raw_data_offset(fp, zinfo):
+    """Offset in fp of zinfo's compressed data, just past its local file header."""
+    fp.seek(zinfo.header_offset)
+    header = fp.read(zipfile.sizeFileHeader)
+    if len(header) != zipfile.sizeFileHeader or header[:4] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad local file header for {zinfo.filename}")
+    fields = struct.unpack(zipfile.structFileHeader, header)
+    return (zinfo.header_offset + zipfile.sizeFileHeader + fields[zipfile._FH_FILENAME_LENGTH]
+            + fields[zipfile._FH_EXTRA_FIELD_LENGTH])
+
+def write_raw_member(zf, zinfo, raw, chunk_size=COPY_CHUNK_SIZE):
+    """Append zinfo to zf, copying zinfo.compress_size bytes from raw verbatim.
+
+    zinfo must already carry compress_type, CRC, file_size and
+    compress_size.  Because those are known up front the local header is
+    final, so this also works on non-seekable output streams.
+    """
+    if zf._writing:
+        raise ValueError("Can't write to the ZIP file while there is another write handle open on it.")
+    zinfo.flag_bits &= ~_MASK_USE_DATA_DESCRIPTOR
+    if not zinfo.external_attr:
+        zinfo.external_attr = 0o600 << 16
+    zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+    with zf._lock:
+        if zf._seekable:
+            zf.fp.seek(zf.start_dir)
+        zinfo.header_offset = zf.fp.tell()
+        zf._writecheck(zinfo)
+        zf._didModify = True
+        zf.fp.write(zinfo.FileHeader(zip64))
+        copy_bytes(raw, zf.fp, zinfo.compress_size, chunk_size)
+        zf.start_dir = zf.fp.tell()
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
@@ -0,0 +1,20 @@
+from aia_generator import features
+from aia_generator.features import FeatureRule, compile_rules, match_features
+
+def _found(requirements):
+    return {name for name, on in match_features(requirements).items() if on}
+
+def test_overlapping_phrases_are_all_found():
+    assert {"speech_recognition", "texting"} <= _found("speech to text message")
+    assert {"text_to_speech", "speech_recognition"} <= _found("text to speech to text")
+
+def test_phrase_inside_a_longer_phrase_is_found(monkeypatch):
+    rules = [FeatureRule("clock", ("clock",)), FeatureRule("radio", ("clock radio",)), FeatureRule("maps", ("map",))]
+    monkeypatch.setattr(features, "FEATURE_RULES", rules)
+    compile_rules()
+    try:
+        assert _found("a clock radio") == {"clock", "radio"}
+        assert _found("clocks and maps") == set()
+    finally:
+        monkeypatch.undo()
+        compile_rules()
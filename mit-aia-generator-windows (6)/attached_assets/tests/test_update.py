@@ -0,0 +1,45 @@
+import zipfile
+from datetime import datetime, timezone
+
+from aia_generator.core import create_aia_file
+from aia_generator.update import update_aia
+
+TIMESTAMP = datetime(2024, 1, 1, tzinfo=timezone.utc)
+SRC = "src/appinventor/ai_user/App"
+
+def _build(path, requirements):
+    create_aia_file("App", "user", "key", "cse", "search", requirements, [], str(path), timestamp=TIMESTAMP)
+
+def test_update_keeps_members_it_does_not_generate(tmp_path):
+    source = tmp_path / "App.aia"
+    _build(source, "play a sound")
+    with zipfile.ZipFile(source, "a") as zf:
+        zf.writestr("App/assets/icon.png", b"\x89PNG icon")
+        zf.writestr(f"App/{SRC}/Screen2.scm", b"#|\n$JSON\n{}\n|#")
+
+    update_aia(str(source), "App", "user", "key", "cse", "search", "button", timestamp=TIMESTAMP)
+
+    with zipfile.ZipFile(source) as zf:
+        names = set(zf.namelist())
+        assert zf.read("App/assets/icon.png") == b"\x89PNG icon"
+        assert zf.read(f"App/{SRC}/Screen2.scm") == b"#|\n$JSON\n{}\n|#"
+    # The sound asset belongs to a feature the new requirements turned off
+    assert "App/assets/sample_sound.mp3" not in names
+    assert {f"App/{SRC}/Screen1.scm", f"App/{SRC}/Screen1.bky", "App/youngandroidproject/project.properties"} <= names
+
+def test_update_moves_kept_members_on_rename(tmp_path):
+    source = tmp_path / "App.aia"
+    _build(source, "button")
+    with zipfile.ZipFile(source, "a") as zf:
+        zf.writestr("App/assets/icon.png", b"icon")
+
+    target = tmp_path / "Other.aia"
+    update_aia(str(source), "Other", "user", "key", "cse", "search", "button", save_path=str(target),
+               timestamp=TIMESTAMP)
+
+    with zipfile.ZipFile(target) as zf:
+        names = zf.namelist()
+        assert zf.read("Other/assets/icon.png") == b"icon"
+    assert not any(name.startswith("App/") for name in names)
+    # Screen1 of the old package folder is replaced, not kept beside the new one
+    assert [name for name in names if name.endswith("Screen1.scm")] == ["Other/src/appinventor/ai_user/Other/Screen1.scm"]
@@ -0,0 +1,50 @@
+import io
+import zipfile
+import zlib
+
+import pytest
+
+from aia_generator.ziputil import raw_data_offset, write_raw_member
+
+class _PipeWriter:
+    """Write-only stream with no tell() or seek(), like a pipe or socket."""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+    def flush(self):
+        pass
+
+def _source_archive(data):
+    source = io.BytesIO()
+    with zipfile.ZipFile(source, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("ext/Foo.aix", data)
+    return source
+
+@pytest.mark.parametrize("seekable", [True, False])
+def test_raw_copy_reads_back(seekable):
+    data = b"extension bytes " * 5000
+    source = _source_archive(data)
+    with zipfile.ZipFile(source) as src:
+        previous = src.getinfo("ext/Foo.aix")
+
+    target = io.BytesIO() if seekable else _PipeWriter()
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("P/first.txt", b"before")
+        zinfo = zipfile.ZipInfo("P/assets/Foo.aix", (2020, 1, 1, 0, 0, 0))
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        zinfo.CRC, zinfo.file_size, zinfo.compress_size = previous.CRC, previous.file_size, previous.compress_size
+        source.seek(raw_data_offset(source, previous))
+        write_raw_member(zf, zinfo, source)
+        zf.writestr("P/last.txt", b"after")
+
+    output = target if seekable else target.buffer
+    with zipfile.ZipFile(io.BytesIO(output.getvalue())) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["P/first.txt", "P/assets/Foo.aix", "P/last.txt"]
+        assert zf.read("P/assets/Foo.aix") == data
+        assert zf.getinfo("P/assets/Foo.aix").CRC == zlib.crc32(data)
+        assert zf.read("P/last.txt") == b"after"